@@ -1,26 +1,211 @@
-from flask import Flask, jsonify, request, render_template, redirect, url_for, session
+from flask import Flask, jsonify, request, render_template, redirect, url_for, session, Response, g, has_request_context, send_file, stream_with_context
 from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
 import os
 import openpyxl
+from openpyxl.packaging.custom import IntProperty
+from openpyxl.utils.exceptions import InvalidFileException
 from datetime import datetime
 import random
 import json
 import secrets
 import sqlite3
 import hashlib
+import threading
+import queue
+import atexit
+import tempfile
+import shutil
+import gzip
+from collections import Counter, OrderedDict, deque
+import numpy as np
+import re
+import math
+import bisect
+import heapq
+import csv
+import io
+import zipfile
+import time
+import array
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; responses fall back to gzip
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where only a single worker is safe
+    fcntl = None
+
+# Every worker process must sign sessions with the same key
+SECRET_KEY_FILE = 'instance/secret_key'
+
+def _load_secret_key():
+    """Return SECRET_KEY from the environment, or a key generated once and kept in SECRET_KEY_FILE"""
+    if os.environ.get('SECRET_KEY'):
+        return os.environ['SECRET_KEY']
+    if not os.path.exists(SECRET_KEY_FILE):
+        directory = os.path.dirname(os.path.abspath(SECRET_KEY_FILE))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.secret-', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(16))
+        try:
+            # Linking fails if another worker created the key first; theirs is used
+            os.link(temp_path, SECRET_KEY_FILE)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temp_path)
+    with open(SECRET_KEY_FILE) as f:
+        return f.read().strip()
 
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(16)  # Generate a secure secret key
+app.secret_key = _load_secret_key()
 CORS(app)
 
 EXCEL_FILE = 'data.xlsx'
 SHEET_NAME = 'Candidates'
 USER_DB = 'instance/users.db'
+# Seconds a user lookup is served from memory by login and admin checks
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', '30'))
+
+# Candidate storage engine: 'excel' keeps data.xlsx as the database, 'sqlite'
+# keeps candidates in CANDIDATE_DB and uses data.xlsx only for import/export
+STORAGE_ENGINE = os.environ.get('STORAGE_ENGINE', 'excel')
+CANDIDATE_DB = 'instance/candidates.db'
+
+# Write-ahead journal of record mutations, flushed into EXCEL_FILE in batches
+# by a background thread every JOURNAL_FLUSH_INTERVAL seconds, or sooner once
+# JOURNAL_FLUSH_THRESHOLD entries are pending
+JOURNAL_FILE = 'instance/data_journal.jsonl'
+JOURNAL_FLUSH_INTERVAL = float(os.environ.get('JOURNAL_FLUSH_INTERVAL', '5'))
+JOURNAL_FLUSH_THRESHOLD = int(os.environ.get('JOURNAL_FLUSH_THRESHOLD', '500'))
+JOURNAL_SEQ_PROPERTY = 'Journal Sequence'
+
+# With ASYNC_WRITES=1 mutations are applied in memory and acknowledged with
+# 202 and a write ticket, and a background writer persists them in order.
+# Only for a single worker process: other workers cannot see queued writes.
+ASYNC_WRITES = os.environ.get('ASYNC_WRITES', '') == '1'
+# Write tickets remembered for /api/writes/<ticket>
+WRITE_TICKET_LIMIT = 10000
+
+# Record changes remembered for /api/data/changes; older versions get a reset
+CHANGE_LOG_LIMIT = int(os.environ.get('CHANGE_LOG_LIMIT', '10000'))
+# Seconds between checks of /api/data/stream for other workers' changes, and
+# between keep-alive comments on an idle stream
+CHANGE_STREAM_POLL = 2
+CHANGE_STREAM_KEEPALIVE = 15
 
 # Default admin credentials
 ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "password123"
 
+# Bearer token that lets a scraper read /metrics without an admin session
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Upper bounds, in seconds, of the latency histogram buckets
+METRIC_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# cProfile output of requests an admin sent with ?profile=1 or X-Profile: 1;
+# only the newest PROFILE_LIMIT profiles are kept
+PROFILE_DIR = 'instance/profiles'
+PROFILE_LIMIT = int(os.environ.get('PROFILE_LIMIT', '50'))
+
+class _Histogram:
+    """Cumulative bucket counts, sum and count of observed durations"""
+    
+    def __init__(self):
+        self.buckets = [0] * len(METRIC_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, seconds):
+        self.total += seconds
+        self.count += 1
+        for i, bound in enumerate(METRIC_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+class Metrics:
+    """Request latencies per route and durations of the storage and analysis
+    phases inside them, rendered in the Prometheus text format. Figures are
+    per process."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.phases = {}
+    
+    def observe_request(self, method, route, status, seconds):
+        with self._lock:
+            self.requests.setdefault((method, route, str(status)), _Histogram()).observe(seconds)
+    
+    def observe_phase(self, phase, seconds):
+        with self._lock:
+            self.phases.setdefault(phase, _Histogram()).observe(seconds)
+    
+    @staticmethod
+    def _labels(**labels):
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return ','.join(f'{key}="{escape(value)}"' for key, value in labels.items())
+    
+    def _render_histograms(self, lines, name, histograms, label_names):
+        for key, histogram in sorted(histograms.items()):
+            labels = self._labels(**dict(zip(label_names, key if isinstance(key, tuple) else (key,))))
+            for bound, count in zip(METRIC_BUCKETS, histogram.buckets):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    
+    def render(self, gauges=()):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP http_request_duration_seconds Time spent handling requests, by route.')
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            self._render_histograms(lines, 'http_request_duration_seconds', self.requests,
+                                    ('method', 'route', 'status'))
+            lines.append('# HELP candidate_phase_duration_seconds Time spent in storage, parsing, '
+                         'serialization and analysis phases.')
+            lines.append('# TYPE candidate_phase_duration_seconds histogram')
+            self._render_histograms(lines, 'candidate_phase_duration_seconds', self.phases, ('phase',))
+        for name, help_text, value in gauges:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+@contextmanager
+def timed(phase):
+    """Time a phase of work for /metrics and the current request's Server-Timing header"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe_phase(phase, elapsed)
+        if has_request_context():
+            timings = g.setdefault('server_timing', {})
+            timings[phase] = timings.get(phase, 0.0) + elapsed
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing the serialization of response bodies"""
+    
+    def dumps(self, obj, **kwargs):
+        with timed('json_serialize'):
+            return super().dumps(obj, **kwargs)
+
+app.json = TimedJSONProvider(app)
+
 # Create sample Excel file if it doesn't exist
 def create_sample_excel():
     if os.path.exists(EXCEL_FILE):
@@ -165,133 +350,2017 @@ def create_sample_excel():
         wb.close()
         print(f"Created sample Excel file: {EXCEL_FILE}")
 
-# Load data from Excel
-def load_data():
-    if not os.path.exists(EXCEL_FILE):
-        create_sample_excel()
-    
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-    sheet = wb[SHEET_NAME]
-    
-    # Get headers from the first row
-    headers = [cell.value for cell in sheet[1]]
-    
-    # Get data from the remaining rows
-    data = []
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        row_data = {}
-        for i, value in enumerate(row):
-            # Convert datetime objects to string
-            if isinstance(value, datetime):
-                value = value.strftime('%Y-%m-%d %H:%M:%S')
-            header = headers[i]
-            # Migrate old "Initial Remarks" to "Initial Screening"
-            if header == 'Initial Remarks':
-                header = 'Initial Screening'
-            row_data[header] = str(value) if value is not None else ''
-        data.append(row_data)
-    
-    return data
+def _file_signature(path):
+    """Return an (mtime_ns, size) tuple for a file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
 
-# Save data to Excel
-def save_data(data):
-    if not os.path.exists(EXCEL_FILE):
-        create_sample_excel()
-
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-    sheet = wb[SHEET_NAME]
-
-    # Clear existing data (keep headers)
-    for row in sheet.iter_rows(min_row=2):
-        for cell in row:
-            cell.value = None
-
-    # Write new data
-    headers = [cell.value for cell in sheet[1]]
-    for row_num, row_data in enumerate(data, 2):
-        for col_num, header in enumerate(headers, 1):
-            sheet.cell(row=row_num, column=col_num).value = row_data.get(header, '')
-
-    wb.save(EXCEL_FILE)
-    wb.close()
-    print(f"Data saved to Excel: {data}")
-    
-    # Desired field order (keep 'Date' at the beginning)
-    desired_fields = [
-        'Name', 'Email ID', 'Contact Number', 'Interested Position', 'Current Role',
-        'Current Organization', 'Current Location', 'Current CTC per Annum',
-        'Expected CTC per Annum', 'Total Years of Experience', 'Notice Period',
-        'Interview Status', 'Application Status', 'Referred By', 'Comments',
-        'In Notice', 'Immediate Joiner', 'Offers in Hand', 'Offered CTC',
-        'Location Preference', 'Certifications', 'Resume', 'LinkedIn Profile',
-        # Stage-specific remarks that should be persisted
-        'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks',
-        # General/legacy remarks
-        'Remarks', 'Reject Mail Sent', 'Final Remarks', 'Month Count'
-    ]
-    
-    # Build ordered headers: Date + desired fields present + any remaining headers
+def _cell_text(value):
+    """Convert a cell value to the string form used in candidate records"""
+    if value is None:
+        return ''
+    # Convert datetime objects to string
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+# Column holding each candidate's stable unique id, assigned by the server
+RECORD_ID_FIELD = 'ID'
+
+# Desired field order (keep 'Date' at the beginning)
+DESIRED_FIELDS = [
+    'Name', 'Email ID', 'Contact Number', 'Interested Position', 'Current Role',
+    'Current Organization', 'Current Location', 'Current CTC per Annum',
+    'Expected CTC per Annum', 'Total Years of Experience', 'Notice Period',
+    'Interview Status', 'Application Status', 'Referred By', 'Comments',
+    'In Notice', 'Immediate Joiner', 'Offers in Hand', 'Offered CTC',
+    'Location Preference', 'Certifications', 'Resume', 'LinkedIn Profile',
+    # Stage-specific remarks that should be persisted
+    'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks',
+    # General/legacy remarks
+    'Remarks', 'Reject Mail Sent', 'Final Remarks', 'Month Count',
+    RECORD_ID_FIELD
+]
+
+# Columns holding numeric CTC values
+NUMERIC_COLUMNS = ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']
+
+# Low-cardinality columns (those with dropdown options) kept dictionary-encoded in memory
+ENCODED_COLUMNS = [
+    'Interested Position', 'Current Role', 'Current Location', 'Location Preference',
+    'Total Years of Experience', 'Notice Period', 'In Notice', 'Immediate Joiner',
+    'Offers in Hand', 'Interview Status', 'Application Status', 'Reject Mail Sent'
+]
+
+# Columns shown to non-admin users
+NON_ADMIN_FIELDS = ['Date', 'Name', 'Email ID', 'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks',
+                    RECORD_ID_FIELD]
+
+def _ordered_headers(headers):
+    """Build ordered headers: Date + desired fields present + any remaining headers"""
     ordered_headers = []
     if 'Date' in headers:
         ordered_headers.append('Date')
-    ordered_headers.extend([h for h in desired_fields if h in headers])
+    ordered_headers.extend([h for h in DESIRED_FIELDS if h in headers])
     # Include any headers not in desired list (e.g., 'Reference')
     ordered_headers.extend([h for h in headers if h not in ordered_headers])
     
     # If there are desired fields missing from headers, append them so they are created
-    ordered_headers.extend([h for h in desired_fields if h not in ordered_headers])
+    ordered_headers.extend([h for h in DESIRED_FIELDS if h not in ordered_headers])
+    return ordered_headers
+
+def _row_values(row_data, headers):
+    """Return the cell values for one record in header order"""
+    values = []
+    for header in headers:
+        # Migrate old "Initial Remarks" to "Initial Screening"
+        if header == 'Initial Screening':
+            value = row_data.get('Initial Screening') or row_data.get('Initial Remarks', '')
+        else:
+            value = row_data.get(header, '')
+        values.append(value)
+    return values
+
+def _normalize_record(record, headers):
+    """Return a record in the string form load_data() returns, with exactly the given headers"""
+    return {header: _cell_text(value) for header, value in zip(headers, _row_values(record, headers))}
+
+def _normalize_changes(changes, headers):
+    """Keep the changed fields that exist as columns, in the string form load_data() returns"""
+    normalized = {}
+    for key, value in changes.items():
+        # Migrate old "Initial Remarks" to "Initial Screening"
+        if key == 'Initial Remarks':
+            key = 'Initial Screening'
+        # Ids are assigned by the server and never change
+        if key in headers and key != RECORD_ID_FIELD:
+            normalized[key] = _cell_text(value)
+    return normalized
+
+def _new_record_id():
+    """Return a new random record id"""
+    return secrets.token_hex(8)
+
+def _apply_mutation(records, entry):
+    """Apply one add/update/delete mutation to a list of records"""
+    if entry['op'] == 'add':
+        records.append(entry['record'])
+    elif entry['op'] == 'update':
+        # Replace rather than modify the row so readers holding it keep a consistent view
+        records[entry['index']] = {**records[entry['index']], **entry['changes']}
+    elif entry['op'] == 'delete':
+        del records[entry['index']]
+
+class _TextColumn:
+    """A column of arbitrary strings"""
     
-    # Rewrite headers in desired order
-    for col_num, header in enumerate(ordered_headers, 1):
-        sheet.cell(row=1, column=col_num).value = header
+    def __init__(self, values=()):
+        self.values = list(values)
+    
+    def get(self, index):
+        return self.values[index]
+    
+    def set(self, index, value):
+        self.values[index] = value
+    
+    def append(self, value):
+        self.values.append(value)
+    
+    def delete(self, index):
+        del self.values[index]
+    
+    def take(self, positions):
+        return [self.values[index] for index in positions]
+    
+    def map(self, func):
+        return [func(value) for value in self.values]
+    
+    def copy(self):
+        return _TextColumn(self.values)
+
+class _EncodedColumn:
+    """A low-cardinality column stored as small integer codes into its distinct values"""
+    
+    # Array type codes, widened as distinct values are added
+    TYPECODES = [('B', 1 << 8), ('H', 1 << 16), ('L', 1 << 32)]
+    
+    def __init__(self, values=()):
+        self.categories = []
+        self.lookup = {}
+        self.codes = array.array('B')
+        for value in values:
+            self.append(value)
+    
+    def _code(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.categories)
+            self.categories.append(value)
+            typecode = next(typecode for typecode, limit in self.TYPECODES if code < limit)
+            if array.array(typecode).itemsize > self.codes.itemsize:
+                self.codes = array.array(typecode, self.codes)
+        return code
+    
+    def get(self, index):
+        return self.categories[self.codes[index]]
+    
+    def set(self, index, value):
+        code = self._code(value)
+        self.codes[index] = code
+    
+    def append(self, value):
+        # Looked up first: a new value may widen the codes array
+        code = self._code(value)
+        self.codes.append(code)
+    
+    def delete(self, index):
+        del self.codes[index]
+    
+    def take(self, positions):
+        categories, codes = self.categories, self.codes
+        return [categories[codes[index]] for index in positions]
+    
+    def map(self, func):
+        # Evaluated once per distinct value rather than once per row
+        results = [func(value) for value in self.categories]
+        return [results[code] for code in self.codes]
+    
+    def copy(self):
+        column = _EncodedColumn()
+        column.categories = list(self.categories)
+        column.lookup = dict(self.lookup)
+        column.codes = array.array(self.codes.typecode, self.codes)
+        return column
+
+class _NumberColumn:
+    """A numeric column stored as float64, NaN for blanks. Values whose text
+    would not come back unchanged from the number (e.g. '12.50', 'n/a') are
+    kept as text on the side."""
+    
+    def __init__(self, values=()):
+        self.numbers = array.array('d')
+        self.text = {}
+        for value in values:
+            self.append(value)
+    
+    @staticmethod
+    def _format(number):
+        if number != number:
+            return ''
+        if number.is_integer() and abs(number) < 1e15:
+            return str(int(number))
+        return repr(number)
+    
+    def _encode(self, index, value):
+        if value == '':
+            return math.nan
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+        if number is None or math.isnan(number) or self._format(number) != value:
+            self.text[index] = value
+            return math.nan
+        return number
+    
+    def get(self, index):
+        text = self.text.get(index)
+        return text if text is not None else self._format(self.numbers[index])
+    
+    def set(self, index, value):
+        self.text.pop(index, None)
+        self.numbers[index] = self._encode(index, value)
+    
+    def append(self, value):
+        self.numbers.append(self._encode(len(self.numbers), value))
+    
+    def delete(self, index):
+        del self.numbers[index]
+        if self.text:
+            self.text = {position - (position > index): value
+                         for position, value in self.text.items() if position != index}
+    
+    def take(self, positions):
+        return [self.get(index) for index in positions]
+    
+    def map(self, func):
+        return [func(value) for value in self.take(range(len(self.numbers)))]
+    
+    def copy(self):
+        column = _NumberColumn()
+        column.numbers = array.array('d', self.numbers)
+        column.text = dict(self.text)
+        return column
+
+class CandidateTable:
+    """The cached candidate records, stored column by column.
+
+    Columns with dropdown options are dictionary-encoded into small integer
+    arrays, CTC columns are float arrays and the rest are lists of strings,
+    so repeated values are stored once instead of once per row dict. It
+    behaves like a list of records: indexing and iteration build row dicts
+    on the fly, and assigning or appending a record writes it back into the
+    columns. Scans should use map_column() rather than building rows.
+    """
+    
+    def __init__(self, headers, records=()):
+        self.columns = {}
+        self.size = 0
+        for header in headers:
+            self.add_column(header)
+        for record in records:
+            self.append(record)
+    
+    @property
+    def headers(self):
+        return list(self.columns)
+    
+    def add_column(self, header):
+        """Add a column, blank for the existing rows"""
+        if header in self.columns:
+            return
+        if header in NUMERIC_COLUMNS:
+            column_type = _NumberColumn
+        elif header in ENCODED_COLUMNS:
+            column_type = _EncodedColumn
+        else:
+            column_type = _TextColumn
+        self.columns[header] = column_type([''] * self.size)
+    
+    def __len__(self):
+        return self.size
+    
+    def _position(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('record index out of range')
+        return index
+    
+    def __getitem__(self, index):
+        index = self._position(index)
+        return {header: column.get(index) for header, column in self.columns.items()}
+    
+    def __iter__(self):
+        return self.iter_rows()
+    
+    def _take(self, headers, positions):
+        # Gathered column by column, which is much faster than cell by cell
+        positions = range(self.size) if positions is None else positions
+        return [self.columns[header].take(positions) if header in self.columns else [''] * len(positions)
+                for header in headers]
+    
+    def iter_rows(self, positions=None, fields=None):
+        """Return an iterator of row dicts, optionally for some positions and with only some fields"""
+        fields = fields or list(self.columns)
+        return (dict(zip(fields, values)) for values in zip(*self._take(fields, positions)))
+    
+    def value_rows(self, headers, positions=None):
+        """Return an iterator of lists of the values under headers, in that order"""
+        return (list(values) for values in zip(*self._take(headers, positions)))
+    
+    def map_column(self, header, func):
+        """Return func(value) for every row of a column (a missing column is blank)"""
+        column = self.columns.get(header)
+        if column is None:
+            return [func('')] * self.size
+        return column.map(func)
+    
+    def _write(self, index, record):
+        for header in record:
+            self.add_column(header)
+        for header, column in self.columns.items():
+            column.set(index, record.get(header, ''))
+    
+    def __setitem__(self, index, record):
+        self._write(self._position(index), record)
+    
+    def append(self, record):
+        for header in record:
+            self.add_column(header)
+        for header, column in self.columns.items():
+            column.append(record.get(header, ''))
+        self.size += 1
+    
+    def __delitem__(self, index):
+        index = self._position(index)
+        for column in self.columns.values():
+            column.delete(index)
+        self.size -= 1
+    
+    def copy(self):
+        """A snapshot that later writes to this table do not affect"""
+        table = CandidateTable([])
+        table.columns = {header: column.copy() for header, column in self.columns.items()}
+        table.size = self.size
+        return table
+
+def _sheet_headers(sheet):
+    """Read the headers from the first row, migrating old 'Initial Remarks' to 'Initial Screening'"""
+    first_row = next(sheet.iter_rows(max_row=1, values_only=True), ())
+    return ['Initial Screening' if value == 'Initial Remarks' else value for value in first_row]
+
+def _sheet_records(sheet, headers):
+    """Yield each data row of a sheet as a record in string form"""
+    # max_col pads short rows, so every record has every header
+    for row in sheet.iter_rows(min_row=2, max_col=len(headers), values_only=True):
+        yield {header: _cell_text(value) for header, value in zip(headers, row)}
+
+def workbook_headers(path=EXCEL_FILE):
+    """Return the candidate headers of a workbook without reading its rows"""
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return _sheet_headers(wb[SHEET_NAME])
+    finally:
+        wb.close()
+
+def iter_workbook_records(path=EXCEL_FILE):
+    """Yield the candidate records of a workbook one at a time.
+
+    openpyxl's read-only mode parses the sheet as a stream instead of
+    building a styled cell object for every value, so a single pass over
+    a large workbook runs in flat memory.
+    """
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        sheet = wb[SHEET_NAME]
+        yield from _sheet_records(sheet, _sheet_headers(sheet))
+    finally:
+        wb.close()
+
+def _read_workbook(path):
+    """Parse a workbook into (headers, CandidateTable, journal sequence)"""
+    with timed('workbook_open'):
+        wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        sheet = wb[SHEET_NAME]
+        with timed('row_parse'):
+            headers = _sheet_headers(sheet)
+            records = CandidateTable(headers, _sheet_records(sheet, headers))
+        
+        # Last journal entry already merged into this workbook (absent in older files)
+        journal_seq = 0
+        if JOURNAL_SEQ_PROPERTY in wb.custom_doc_props.names:
+            journal_seq = int(wb.custom_doc_props[JOURNAL_SEQ_PROPERTY].value)
+    finally:
+        wb.close()
+    return headers, records, journal_seq
+
+def _write_workbook(path, headers, rows, journal_seq=0):
+    """Write headers and row values to a workbook in a single pass.
+
+    The sheet is streamed with openpyxl's write-only mode into a temporary
+    file next to the target, which is then atomically renamed over it, so a
+    crash mid-save leaves the previous workbook intact. The workbook records
+    the last journal entry it includes so a replay never applies it twice.
+    """
+    _commit_workbook(_save_workbook(path, headers, rows, journal_seq), path)
+
+def _fsync_path(path):
+    """Flush a file, or a directory's entries, to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _save_workbook(path, headers, rows, journal_seq=0):
+    """Write a workbook to a temporary file next to path and return its name"""
+    with timed('workbook_serialize'):
+        wb = openpyxl.Workbook(write_only=True)
+        sheet = wb.create_sheet(SHEET_NAME)
+        sheet.append(headers)
+        for values in rows:
+            sheet.append(values)
+        wb.custom_doc_props.append(IntProperty(name=JOURNAL_SEQ_PROPERTY, value=journal_seq))
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.data-', suffix='.xlsx', dir=directory)
+    os.close(fd)
+    try:
+        with timed('workbook_save'):
+            wb.save(temp_path)
+            _fsync_path(temp_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+def _commit_workbook(temp_path, path):
+    """Atomically move a workbook written by _save_workbook() over path"""
+    try:
+        # mkstemp creates the file owner-only; keep the existing workbook's permissions
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # Make the rename durable before anything relies on it, such as trimming the journal
+    _fsync_path(os.path.dirname(os.path.abspath(path)))
+
+class ExcelStorage:
+    """Candidates stored in data.xlsx, with mutations kept in a write-ahead journal.
+
+    Each batch of mutations is fsynced as one JSON line, so replay applies
+    all of it or none of it, and later folded into the workbook by flush();
+    the journal is replayed on top of the workbook
+    whenever it is read. Other worker processes append to the same journal,
+    so their changes can be picked up by reading just the new entries.
+    """
+    
+    def __init__(self, path, journal_path):
+        self.path = path
+        self.journal_path = journal_path
+        self.journal_seq = 0
+        self.pending = 0
+        # Signature of the workbook the cached records were read from
+        self.workbook_signature = None
+        # Byte offset just past the last complete journal line, valid while the
+        # journal still has journal_signature
+        self.journal_end = 0
+        self.journal_signature = None
+    
+    def signature(self):
+        """Return the combined (mtime, size) signature of the workbook and its journal"""
+        return (_file_signature(self.path), _file_signature(self.journal_path))
+    
+    def _read_journal(self, after_seq):
+        """Return the journal batches, {'seq': n, 'entries': [...]}, with a sequence
+        number greater than after_seq (caller holds shared_data_lock)"""
+        self.journal_end = 0
+        self.journal_signature = _file_signature(self.journal_path)
+        if self.journal_signature is None:
+            return []
+        
+        entries = []
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('unterminated line')
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn trailing line from a crash mid-append; apply() cuts it off
+                    # before appending, so nothing after it was acknowledged
+                    break
+                self.journal_end += len(line)
+                if entry['seq'] > after_seq:
+                    # Journals written before batches were one line each hold a single mutation
+                    entries.append(entry if 'entries' in entry else {'seq': entry['seq'], 'entries': [entry]})
+        return entries
+    
+    def _truncate_journal(self, journal_seq):
+        """Drop journal entries up to journal_seq, keeping any appended since"""
+        if not os.path.exists(self.journal_path):
+            return 0
+        
+        remaining = self._read_journal(journal_seq)
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        fd, temp_path = tempfile.mkstemp(prefix='.journal-', suffix='.jsonl', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for batch in remaining:
+                f.write(json.dumps(batch) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+        _fsync_path(directory)
+        self.journal_end = os.path.getsize(self.journal_path)
+        self.journal_signature = _file_signature(self.journal_path)
+        return sum(len(batch['entries']) for batch in remaining)
+    
+    def read(self):
+        """Return (headers, records), replaying mutations not yet flushed into the workbook"""
+        if not os.path.exists(self.path):
+            create_sample_excel()
+        
+        self.workbook_signature = _file_signature(self.path)
+        headers, records, journal_seq = _read_workbook(self.path)
+        self.pending = 0
+        with timed('journal_replay'):
+            for batch in self._read_journal(journal_seq):
+                for entry in batch['entries']:
+                    _apply_mutation(records, entry)
+                journal_seq = batch['seq']
+                self.pending += len(batch['entries'])
+        
+        self.journal_seq = journal_seq
+        return headers, records
+    
+    def read_new(self):
+        """Return the journal entries appended since the last read, or None if
+        the workbook was rewritten and must be read again"""
+        if _file_signature(self.path) != self.workbook_signature:
+            return None
+        batches = self._read_journal(self.journal_seq)
+        entries = [entry for batch in batches for entry in batch['entries']]
+        if batches:
+            self.journal_seq = batches[-1]['seq']
+            self.pending += len(entries)
+        return entries
+    
+    def replace(self, headers, records):
+        """Write all records to the workbook and empty the journal"""
+        ordered_headers = _ordered_headers(headers)
+        rows = [_row_values(row_data, ordered_headers) for row_data in records]
+        _write_workbook(self.path, ordered_headers, rows, self.journal_seq)
+        self.workbook_signature = _file_signature(self.path)
+        
+        # Everything in the journal is now part of the workbook
+        self._truncate_journal(self.journal_seq)
+        self.pending = 0
+        return ordered_headers, [dict(zip(ordered_headers, map(_cell_text, values))) for values in rows]
+    
+    def apply(self, entries):
+        """Durably journal a batch of mutations as one line with a single fsync
+        (caller holds shared_data_lock exclusively)"""
+        if not entries:
+            return
+        data = (json.dumps({'seq': self.journal_seq + 1, 'entries': entries}) + '\n').encode('utf-8')
+        
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        os.makedirs(directory, exist_ok=True)
+        created = not os.path.exists(self.journal_path)
+        if _file_signature(self.journal_path) != self.journal_signature:
+            # Another worker appended or rewrote it; find where its complete lines end
+            self._read_journal(self.journal_seq)
+        end = self.journal_end
+        # Unbuffered, so nothing is left to be written after a failed write
+        with timed('journal_write'), open(self.journal_path, 'ab', buffering=0) as f:
+            try:
+                # Cut off a torn line left by a crash, which would hide what follows
+                f.truncate(end)
+                written = 0
+                while written < len(data):
+                    written += f.write(data[written:])
+                os.fsync(f.fileno())
+            except BaseException:
+                # Leave no partial batch behind for the next append to follow
+                f.truncate(end)
+                raise
+        if created:
+            _fsync_path(directory)
+        self.journal_end = end + len(data)
+        self.journal_signature = _file_signature(self.journal_path)
+        
+        self.journal_seq += 1
+        self.pending += len(entries)
+    
+    def prepare_flush(self, headers, records):
+        """Snapshot the rows of the cached CandidateTable to flush, or return
+        None if the journal is empty"""
+        if not self.pending:
+            return None
+        ordered_headers = _ordered_headers(headers)
+        rows = list(records.value_rows(ordered_headers))
+        return ordered_headers, rows, self.journal_seq
+    
+    def write_flush(self, snapshot):
+        """Write a snapshot to a temporary workbook; safe to run without the data locks"""
+        return _save_workbook(self.path, *snapshot)
+    
+    def finish_flush(self, snapshot, written):
+        """Move the written workbook into place, drop the flushed entries from
+        the journal and return the new header order"""
+        ordered_headers, _, journal_seq = snapshot
+        _commit_workbook(written, self.path)
+        self.workbook_signature = _file_signature(self.path)
+        self.pending = self._truncate_journal(journal_seq)
+        return ordered_headers
+
+class SQLiteStorage:
+    """Candidates stored in an indexed SQLite table.
+
+    Updates and deletes are single-row statements, so nothing needs to be
+    flushed. On first use the table is imported from data.xlsx, which stays
+    available as an import/export format through export_excel().
+    """
+    
+    # Columns that get their own index for lookups and filtering
+    INDEXED_COLUMNS = [RECORD_ID_FIELD, 'Email ID', 'Date', 'Interview Status', 'Application Status']
+    
+    def __init__(self, path):
+        self.path = path
+        self.pending = 0
+        self.row_ids = []
+        self._conn = None
+        self._pid = None
+    
+    @staticmethod
+    def _quote(name):
+        """Quote a column name for use in SQL"""
+        return '"' + name.replace('"', '""') + '"'
+    
+    def _connection(self):
+        # A single connection guarded by _data_lock, like every other storage call.
+        # Connections must not be carried across fork, so each worker opens its own.
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS candidate_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS candidates (row_id INTEGER PRIMARY KEY)')
+            self._conn.commit()
+        return self._conn
+    
+    def _meta(self, key, default=None):
+        row = self._connection().execute('SELECT value FROM candidate_meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+    
+    def _set_meta(self, key, value):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO candidate_meta (key, value) VALUES (?, ?)', (key, value))
+    
+    def _bump_version(self):
+        """Record a change so other processes see a new signature (inside the write transaction)"""
+        self._set_meta('version', str(int(self._meta('version', '0')) + 1))
+    
+    def _ensure_columns(self, headers):
+        """Add any missing header columns and their indexes"""
+        conn = self._connection()
+        existing = {row[1] for row in conn.execute('PRAGMA table_info(candidates)')}
+        for header in headers:
+            if header not in existing:
+                conn.execute(f"ALTER TABLE candidates ADD COLUMN {self._quote(header)} TEXT DEFAULT ''")
+        for header in self.INDEXED_COLUMNS:
+            if header in headers:
+                index_name = 'idx_candidates_' + header.lower().replace(' ', '_')
+                conn.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON candidates ({self._quote(header)})')
+        self._set_meta('headers', json.dumps(headers))
+    
+    def signature(self):
+        return self._meta('version')
+    
+    def read_new(self):
+        # Row positions may have shifted, so changes by other workers need a full read
+        return None
+    
+    def read(self):
+        """Return (headers, records), importing data.xlsx the first time"""
+        if self._meta('headers') is None:
+            self._import_excel()
+        
+        headers = json.loads(self._meta('headers'))
+        if RECORD_ID_FIELD not in headers:
+            # Tables created before records had ids; the ids are filled in by update
+            headers.append(RECORD_ID_FIELD)
+            with self._connection():
+                self._ensure_columns(headers)
+                self._bump_version()
+        columns = ', '.join(self._quote(header) for header in headers)
+        records = CandidateTable(headers)
+        self.row_ids = []
+        with timed('sqlite_read'):
+            for row in self._connection().execute(f'SELECT row_id, {columns} FROM candidates ORDER BY row_id'):
+                self.row_ids.append(row[0])
+                records.append({header: _cell_text(value) for header, value in zip(headers, row[1:])})
+        return headers, records
+    
+    def _import_excel(self):
+        """Seed the table from data.xlsx, creating the sample workbook if needed"""
+        if not os.path.exists(EXCEL_FILE):
+            create_sample_excel()
+        # Rows are streamed from the workbook straight into the table
+        ordered_headers = _ordered_headers(workbook_headers(EXCEL_FILE))
+        rows = (_row_values(record, ordered_headers) for record in iter_workbook_records(EXCEL_FILE))
+        count = self._replace_rows(ordered_headers, (list(map(_cell_text, values)) for values in rows))
+        print(f"Imported {count} candidates from {EXCEL_FILE} into {self.path}")
+    
+    def _replace_rows(self, ordered_headers, rows):
+        """Replace all rows with an iterable of value lists in one transaction; returns the row count"""
+        conn = self._connection()
+        with conn:
+            self._ensure_columns(ordered_headers)
+            conn.execute('DELETE FROM candidates')
+            columns = ', '.join(self._quote(header) for header in ordered_headers)
+            placeholders = ', '.join('?' for _ in ordered_headers)
+            conn.executemany(f'INSERT INTO candidates ({columns}) VALUES ({placeholders})', rows)
+            self._bump_version()
+        self.row_ids = [row[0] for row in conn.execute('SELECT row_id FROM candidates ORDER BY row_id')]
+        return len(self.row_ids)
+    
+    def replace(self, headers, records):
+        """Replace all rows in one transaction"""
+        ordered_headers = _ordered_headers(headers)
+        records = [_normalize_record(row_data, ordered_headers) for row_data in records]
+        self._replace_rows(ordered_headers, ([row_data[header] for header in ordered_headers]
+                                             for row_data in records))
+        return ordered_headers, records
+    
+    def apply(self, entries):
+        """Run a batch of mutations as indexed single-row statements in one transaction"""
+        conn = self._connection()
+        row_ids = list(self.row_ids)
+        with timed('sqlite_write'), conn:
+            for entry in entries:
+                if entry['op'] == 'add':
+                    record = entry['record']
+                    columns = ', '.join(self._quote(header) for header in record)
+                    placeholders = ', '.join('?' for _ in record)
+                    cursor = conn.execute(f'INSERT INTO candidates ({columns}) VALUES ({placeholders})',
+                                          list(record.values()))
+                    row_ids.append(cursor.lastrowid)
+                elif entry['op'] == 'update':
+                    changes = entry['changes']
+                    if changes:
+                        assignments = ', '.join(f'{self._quote(key)} = ?' for key in changes)
+                        conn.execute(f'UPDATE candidates SET {assignments} WHERE row_id = ?',
+                                     list(changes.values()) + [row_ids[entry['index']]])
+                elif entry['op'] == 'delete':
+                    conn.execute('DELETE FROM candidates WHERE row_id = ?', (row_ids[entry['index']],))
+                    del row_ids[entry['index']]
+            self._bump_version()
+        # Only adopt the new positions once the transaction has committed
+        self.row_ids = row_ids
+    
+    def prepare_flush(self, headers, records):
+        # Every mutation is already committed
+        return None
+
+def _create_storage():
+    """Create the candidate storage engine selected by STORAGE_ENGINE"""
+    if STORAGE_ENGINE == 'sqlite':
+        return SQLiteStorage(CANDIDATE_DB)
+    if STORAGE_ENGINE == 'excel':
+        return ExcelStorage(EXCEL_FILE, JOURNAL_FILE)
+    raise ValueError(f"Unknown storage engine: {STORAGE_ENGINE}")
+
+storage = _create_storage()
+
+def _numeric_value(value):
+    """Return a CTC value as a float, or None if it is not a plain number"""
+    if value and value.replace('.', '', 1).isdigit():
+        return float(value)
+    return None
+
+class RunningAggregates:
+    """Per-group sums kept in step with the cached dataset.
+
+    Group sums are built for a column the first time it is requested and then
+    maintained record by record, so the group analysis answers in O(groups)
+    rather than rescanning every row. Overall statistics are computed by
+    AnalyticsEngine straight from the table's columns.
+    """
+    
+    def __init__(self):
+        self.rebuild(CandidateTable([]))
+    
+    def rebuild(self, records):
+        self.groups = {}
+    
+    def _group_add(self, column, record, sign):
+        self._group_add_values(column, record.get(column, 'Unknown'),
+                               [_numeric_value(record.get(col)) for col in NUMERIC_COLUMNS], sign)
+    
+    def _group_add_values(self, column, group_key, values, sign):
+        groups = self.groups[column]
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = {'rows': 0, 'sums': {col: [0.0, 0] for col in NUMERIC_COLUMNS}}
+        group['rows'] += sign
+        for col, value in zip(NUMERIC_COLUMNS, values):
+            if value is not None:
+                group['sums'][col][0] += sign * value
+                group['sums'][col][1] += sign
+        if group['rows'] == 0:
+            del groups[group_key]
+    
+    def apply(self, index, old_record, new_record):
+        """Account for a record being added (old is None), updated or deleted (new is None)"""
+        for column in self.groups:
+            if old_record is not None:
+                self._group_add(column, old_record, -1)
+            if new_record is not None:
+                self._group_add(column, new_record, 1)
+    
+    def group_sums(self, column, records):
+        """Per-group [sum, count] for each numeric column, tracking the column from now on"""
+        if column not in self.groups:
+            self.groups[column] = {}
+            group_keys = (records.map_column(column, str) if column in records.columns
+                          else ['Unknown'] * len(records))
+            numbers = [records.map_column(col, _numeric_value) for col in NUMERIC_COLUMNS]
+            for group_key, values in zip(group_keys, zip(*numbers)):
+                self._group_add_values(column, group_key, values, 1)
+        return self.groups[column]
+
+aggregates = RunningAggregates()
+
+class AnalyticsEngine:
+    """Vectorized statistics over the numeric columns of the cached CandidateTable.
+
+    The float64 arrays of the CTC columns and the code arrays of encoded
+    columns are read in place through NumPy, so nothing is kept besides the
+    table itself. Values count as numbers the way _numeric_value() reads
+    them: blanks, negatives and text such as 'n/a' are left out.
+    """
+    
+    PERCENTILES = [25, 50, 90]
+    
+    @staticmethod
+    def _numbers(records, col):
+        """A float64 array of a column's values, NaN where there is no number"""
+        column = records.columns.get(col)
+        if not isinstance(column, _NumberColumn):
+            numbers = records.map_column(col, _numeric_value)
+            return np.array([np.nan if number is None else number for number in numbers], dtype=np.float64)
+        # A temporary view: the array cannot grow while the buffer is exported
+        values = np.frombuffer(column.numbers, dtype=np.float64)
+        values = np.where(np.isfinite(values) & (values >= 0), values, np.nan)
+        for index, text in column.text.items():
+            number = _numeric_value(text)
+            if number is not None:
+                values[index] = number
+        return values
+    
+    @staticmethod
+    def _codes(records, column):
+        """Return (categories, integer codes) for the values of a column"""
+        encoded = records.columns.get(column)
+        if isinstance(encoded, _EncodedColumn):
+            return encoded.categories, np.array(encoded.codes, dtype=np.int64)
+        values = records.map_column(column, str) if encoded is not None else ['Unknown'] * len(records)
+        categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+        return list(categories), codes
+    
+    def _valid(self, records, col):
+        values = self._numbers(records, col)
+        return values[~np.isnan(values)]
+    
+    def summary(self, records):
+        """Mean/min/max/count for each numeric column that has values"""
+        summary = {}
+        for col in NUMERIC_COLUMNS:
+            values = self._valid(records, col)
+            if len(values):
+                summary[col] = {
+                    "mean": float(values.mean()),
+                    "min": float(values.min()),
+                    "max": float(values.max()),
+                    "count": int(len(values))
+                }
+        return summary
+    
+    def percentiles(self, records):
+        """p25/p50/p90 for each numeric column that has values"""
+        result = {}
+        for col in NUMERIC_COLUMNS:
+            values = self._valid(records, col)
+            if len(values):
+                points = np.percentile(values, self.PERCENTILES)
+                result[col] = {f"p{p}": float(v) for p, v in zip(self.PERCENTILES, points)}
+        return result
+    
+    def hike_ratio(self, records):
+        """Statistics of Expected / Current CTC for candidates with both values"""
+        current = self._numbers(records, 'Current CTC per Annum')
+        expected = self._numbers(records, 'Expected CTC per Annum')
+        mask = ~np.isnan(current) & ~np.isnan(expected) & (current > 0)
+        if not mask.any():
+            return None
+        ratios = expected[mask] / current[mask]
+        points = np.percentile(ratios, self.PERCENTILES)
+        result = {
+            "mean": float(ratios.mean()),
+            "min": float(ratios.min()),
+            "max": float(ratios.max()),
+            "count": int(len(ratios))
+        }
+        result.update({f"p{p}": float(v) for p, v in zip(self.PERCENTILES, points)})
+        return result
+    
+    def histogram(self, records, col, bins):
+        """Equal-width bins over the values of a numeric column"""
+        values = self._valid(records, col)
+        if not len(values):
+            return None
+        counts, edges = np.histogram(values, bins=min(bins, len(values)))
+        return {"column": col, "edges": edges.tolist(), "counts": counts.tolist()}
+    
+    def group_percentiles(self, column, records):
+        """p25/p50/p90 per group for each numeric column"""
+        categories, codes = self._codes(records, column)
+        result = {}
+        for col in NUMERIC_COLUMNS:
+            values = self._numbers(records, col)
+            mask = ~np.isnan(values)
+            group_codes, group_values = codes[mask], values[mask]
+            # Sort by group then value so each group's values are one contiguous slice
+            order = np.lexsort((group_values, group_codes))
+            group_codes, group_values = group_codes[order], group_values[order]
+            present, starts = np.unique(group_codes, return_index=True)
+            ends = np.append(starts[1:], len(group_codes))
+            for code, start, end in zip(present, starts, ends):
+                points = np.percentile(group_values[start:end], self.PERCENTILES)
+                group = result.setdefault(categories[code], {})
+                for p, v in zip(self.PERCENTILES, points):
+                    group[f"{col}_p{p}"] = float(v)
+        return result
+
+analytics = AnalyticsEngine()
+
+# Columns covered by full-text search, and the subset non-admin users may search
+SEARCH_FIELDS = [
+    'Name', 'Email ID', 'Interested Position', 'Current Role', 'Current Organization',
+    'Current Location', 'Certifications', 'Initial Screening', 'Round 1 Remarks',
+    'Round 2 Remarks', 'Comments', 'Remarks', 'Final Remarks'
+]
+
+# A query word that prefixes more vocabulary terms than this only expands to the
+# ones found in the most records, which keeps one- and two-letter prefixes fast
+SEARCH_PREFIX_TERMS = 64
+
+def _tokenize(text):
+    """Split text into case-folded word tokens"""
+    return re.findall(r'\w+', text.casefold())
+
+def _pack_counts(tf, public_tf):
+    # One int per posting instead of a pair. As public_tf <= tf, tf is
+    # isqrt(packed) and public_tf the remainder; common values stay below 256
+    return tf * (tf + 1) + public_tf
+
+class SearchIndex:
+    """Inverted index over SEARCH_FIELDS, kept in step with the cached dataset.
+
+    Each record gets an internal document id; postings map a token to
+    {doc_id: packed (term frequency, term frequency in non-admin fields)}.
+    A sorted vocabulary makes every query token a prefix match.
+    """
+    
+    def __init__(self):
+        self.rebuild(CandidateTable([]))
+    
+    def rebuild(self, records):
+        self.postings = {}
+        self.vocabulary = []
+        self.doc_ids = []
+        self.next_doc_id = 0
+        self._positions = None
+        for record in records.iter_rows(fields=SEARCH_FIELDS):
+            self.doc_ids.append(self._add(record))
+    
+    def _terms(self, record):
+        terms = {}
+        for field in SEARCH_FIELDS:
+            public = field in NON_ADMIN_FIELDS
+            for token in _tokenize(record.get(field, '')):
+                counts = terms.setdefault(token, [0, 0])
+                counts[0] += 1
+                if public:
+                    counts[1] += 1
+        return terms
+    
+    def _add(self, record):
+        doc_id = self.next_doc_id
+        self.next_doc_id += 1
+        for token, (tf, public_tf) in self._terms(record).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            posting[doc_id] = _pack_counts(tf, public_tf)
+        return doc_id
+    
+    def _remove(self, doc_id, record):
+        for token in self._terms(record):
+            posting = self.postings[token]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+    
+    def apply(self, index, old_record, new_record):
+        self._positions = None
+        if old_record is None:
+            self.doc_ids.append(self._add(new_record))
+        elif new_record is None:
+            self._remove(self.doc_ids[index], old_record)
+            del self.doc_ids[index]
+        else:
+            self._remove(self.doc_ids[index], old_record)
+            self.doc_ids[index] = self._add(new_record)
+    
+    def _expand(self, token):
+        """Vocabulary terms starting with token, at most SEARCH_PREFIX_TERMS of them"""
+        start = bisect.bisect_left(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + '\uffff')
+        terms = self.vocabulary[start:end]
+        if len(terms) > SEARCH_PREFIX_TERMS:
+            terms = heapq.nlargest(SEARCH_PREFIX_TERMS, terms, key=lambda term: (term == token, len(self.postings[term])))
+        return terms
+    
+    def search(self, query, public_only=False, limit=None):
+        """Return (hits, total): the best (position, score) pairs matching every
+        query token, best first, at most limit of them, and how many match"""
+        tokens = _tokenize(query)
+        if not tokens:
+            return [], 0
+        
+        total_docs = len(self.doc_ids) or 1
+        isqrt = math.isqrt
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            get_score = token_scores.get
+            for term in self._expand(token):
+                posting = self.postings[term]
+                idf = math.log(1 + total_docs / len(posting))
+                # Whole-word matches rank above prefix matches
+                weight = idf if term == token else idf / 2
+                for doc_id, packed in posting.items():
+                    # Unpacked as in _pack_counts()
+                    tf = isqrt(packed)
+                    if public_only:
+                        tf = packed - tf * (tf + 1)
+                    if tf:
+                        token_scores[doc_id] = get_score(doc_id, 0) + tf * weight
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return [], 0
+        
+        if self._positions is None:
+            self._positions = {doc_id: position for position, doc_id in enumerate(self.doc_ids)}
+        positions = self._positions
+        hits = ((positions[doc_id], score) for doc_id, score in scores.items())
+        key = lambda hit: (-hit[1], hit[0])
+        # Only the hits up to the requested page need ordering
+        hits = sorted(hits, key=key) if limit is None else heapq.nsmallest(limit, hits, key=key)
+        return hits, len(scores)
+
+search_index = SearchIndex()
+
+# Categorical columns with value counts in /api/facets
+FACET_COLUMNS = ENCODED_COLUMNS
+
+class FacetIndex:
+    """Value -> row set indexes over FACET_COLUMNS, kept in step with the cached dataset.
+
+    Row sets are bitsets held in Python ints over internal document ids, so
+    counting the candidates with a value under a filter is one AND and a
+    popcount. Like SearchIndex, rows keep their document id when others are
+    deleted, so no set has to be renumbered.
+    """
+    
+    def __init__(self):
+        self.rebuild(CandidateTable([]))
+    
+    def rebuild(self, records):
+        self.doc_ids = list(range(len(records)))
+        self.next_doc_id = len(records)
+        self.values = {}
+        for column in FACET_COLUMNS:
+            doc_lists = {}
+            for doc_id, value in zip(self.doc_ids, records.map_column(column, str)):
+                doc_lists.setdefault(value, []).append(doc_id)
+            self.values[column] = {value: self._bitset(doc_ids) for value, doc_ids in doc_lists.items()}
+    
+    def _bitset(self, doc_ids):
+        bits = bytearray(self.next_doc_id // 8 + 1)
+        for doc_id in doc_ids:
+            bits[doc_id >> 3] |= 1 << (doc_id & 7)
+        return int.from_bytes(bits, 'little')
+    
+    def _add(self, doc_id, record):
+        for column, values in self.values.items():
+            value = record.get(column, '')
+            values[value] = values.get(value, 0) | (1 << doc_id)
+    
+    def _remove(self, doc_id, record):
+        for column, values in self.values.items():
+            value = record.get(column, '')
+            values[value] ^= 1 << doc_id
+            if not values[value]:
+                del values[value]
+    
+    def apply(self, index, old_record, new_record):
+        if old_record is None:
+            doc_id = self.next_doc_id
+            self.next_doc_id += 1
+            self.doc_ids.append(doc_id)
+            self._add(doc_id, new_record)
+        elif new_record is None:
+            self._remove(self.doc_ids[index], old_record)
+            del self.doc_ids[index]
+        else:
+            self._remove(self.doc_ids[index], old_record)
+            self._add(self.doc_ids[index], new_record)
+    
+    def matching(self, filters):
+        """Return the rows matching the filters on FACET_COLUMNS as a bitset (None
+        for all rows) and the filters on other columns, which need a scan"""
+        docs, remaining = None, {}
+        for column, value in filters.items():
+            if column not in self.values:
+                remaining[column] = value
+                continue
+            needle = value.casefold()
+            bits = 0
+            for facet_value, facet_bits in self.values[column].items():
+                if needle in facet_value.casefold():
+                    bits |= facet_bits
+            docs = bits if docs is None else docs & bits
+        return docs, remaining
+    
+    def rows_at(self, positions):
+        """Bitset of the rows at the given positions"""
+        return self._bitset(self.doc_ids[position] for position in positions)
+    
+    def counts(self, column, docs=None):
+        """Rows per value of a column, most common first, among docs (a bitset) or all rows"""
+        counts = [(value, (bits if docs is None else bits & docs).bit_count())
+                  for value, bits in self.values[column].items()]
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return {value: count for value, count in counts if count}
+
+facets = FacetIndex()
+
+class RecordIdIndex:
+    """Hash index from record id to list position, kept in step with the cached dataset.
+
+    A delete moves every later record up one place; rather than renumbering
+    them each time, positions from the first such delete on are renumbered
+    once, when one of them is next looked up. Batches delete from the highest
+    position down, so their lookups never need it.
+
+    Also hands out record revisions, a hash of the record's contents used for
+    optimistic concurrency checks. Revisions are cached by id until the
+    record changes.
+    """
+    
+    def __init__(self):
+        self.rebuild(CandidateTable([]))
+    
+    def rebuild(self, records):
+        self.ids = records.map_column(RECORD_ID_FIELD, str)
+        self.positions = {}
+        self.revisions = {}
+        # Positions from here on may be stale, None if all are current
+        self.stale_from = None
+        for position, record_id in enumerate(self.ids):
+            # Keep the first of any duplicates; the rest are given new ids
+            if record_id:
+                self.positions.setdefault(record_id, position)
+    
+    def _renumber(self):
+        if self.stale_from is None:
+            return
+        start, self.stale_from = self.stale_from, None
+        seen = set()
+        for position in range(start, len(self.ids)):
+            record_id = self.ids[position]
+            if not record_id or record_id in seen:
+                continue
+            seen.add(record_id)
+            # An entry before start is current, and an earlier duplicate
+            current = self.positions.get(record_id)
+            if current is None or current >= start:
+                self.positions[record_id] = position
+    
+    def apply(self, index, old_record, new_record):
+        if old_record is not None:
+            old_id = self.ids[index]
+            self.revisions.pop(old_id, None)
+            if self.position(old_id) == index:
+                del self.positions[old_id]
+        if new_record is None:
+            del self.ids[index]
+            # Every later record has moved up one place
+            if self.stale_from is None or index < self.stale_from:
+                self.stale_from = index
+            return
+        
+        record_id = new_record.get(RECORD_ID_FIELD, '')
+        self.revisions.pop(record_id, None)
+        if old_record is None:
+            self.ids.append(record_id)
+        else:
+            self.ids[index] = record_id
+        if record_id and self.position(record_id) is None:
+            self.positions[record_id] = index
+    
+    def position(self, record_id):
+        """Return the position of the record with record_id, or None"""
+        position = self.positions.get(record_id)
+        if position is not None and self.stale_from is not None and position >= self.stale_from:
+            self._renumber()
+            position = self.positions.get(record_id)
+        return position
+    
+    def missing(self):
+        """Positions of records with no id or a duplicate one"""
+        self._renumber()
+        return [position for position, record_id in enumerate(self.ids)
+                if self.positions.get(record_id) != position]
+    
+    def revision(self, record):
+        """Return a short hash of a cached record's current contents (caller holds _data_lock)"""
+        record_id = record.get(RECORD_ID_FIELD, '')
+        digest = self.revisions.get(record_id)
+        if digest is None:
+            digest = hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()[:16]
+            if record_id:
+                self.revisions[record_id] = digest
+        return digest
+
+record_ids = RecordIdIndex()
+
+class ChangeLog:
+    """Versioned log of the records inserted, updated and deleted in the cached dataset.
+
+    Versions are the shared version stamp of the data the cache held, so they
+    mean the same in every worker. Each worker notes its change counter at the
+    stamps it hands out, and answers a version with every change since the
+    latest of those not after it: possibly a few the client already has, which
+    it applies again. A version older than that, or than the CHANGE_LOG_LIMIT
+    retained changes, is answered with a reset. Changes that arrive as a full
+    reload, such as another worker's flush, are found by comparing the new
+    table with the previous one column by column. Must come after record_ids
+    in _dataset_indexes.
+    """
+    
+    def __init__(self):
+        self.counter = 0
+        self.entries = deque()
+        # (stamp, counter) for the versions handed out, oldest first
+        self.checkpoints = deque()
+        # The cached table, None until the dataset is first loaded
+        self.records = None
+        # Notified whenever the counter moves
+        self.changed = threading.Condition()
+    
+    def rebuild(self, records):
+        old_records, self.records = self.records, records
+        if old_records is None:
+            return
+        old_positions = {}
+        for position, record_id in enumerate(old_records.map_column(RECORD_ID_FIELD, str)):
+            if record_id:
+                old_positions.setdefault(record_id, position)
+        
+        # (position, old position) of every id in both tables
+        pairs = []
+        for record_id, position in record_ids.positions.items():
+            old_position = old_positions.pop(record_id, None)
+            if old_position is None:
+                self._log(record_id, 'insert')
+            else:
+                pairs.append((record_id, position, old_position))
+        for header in set(records.columns) | set(old_records.columns):
+            values = records.map_column(header, str)
+            old_values = old_records.map_column(header, str)
+            unchanged = []
+            for record_id, position, old_position in pairs:
+                if values[position] == old_values[old_position]:
+                    unchanged.append((record_id, position, old_position))
+                else:
+                    self._log(record_id, 'update')
+            pairs = unchanged
+        for record_id in old_positions:
+            self._log(record_id, 'delete')
+        self._notify()
+    
+    def apply(self, index, old_record, new_record):
+        old_id = old_record.get(RECORD_ID_FIELD, '') if old_record is not None else ''
+        new_id = new_record.get(RECORD_ID_FIELD, '') if new_record is not None else ''
+        # record_ids is already up to date; an id still there belonged to a duplicate row
+        if old_id and old_id != new_id and record_ids.position(old_id) is None:
+            self._log(old_id, 'delete')
+        if new_id:
+            self._log(new_id, 'update' if old_id == new_id else 'insert')
+        self._notify()
+    
+    def _log(self, record_id, kind):
+        self.counter += 1
+        self.entries.append((self.counter, record_id, kind))
+        if len(self.entries) > CHANGE_LOG_LIMIT:
+            self.entries.popleft()
+            while len(self.checkpoints) > 1 and self.checkpoints[1][1] < self.entries[0][0]:
+                self.checkpoints.popleft()
+    
+    def _notify(self):
+        with self.changed:
+            self.changed.notify_all()
+    
+    def version(self):
+        """Return the version of the cached data (caller holds _data_lock, with the cache current)"""
+        stamp = _data_cache['signature'][0]
+        if self.checkpoints and self.checkpoints[-1][0] > stamp:
+            # The stamp was reset; older versions can no longer be placed
+            self.checkpoints.clear()
+        if not self.checkpoints or self.checkpoints[-1][0] != stamp:
+            self.checkpoints.append((stamp, self.counter))
+        return str(stamp)
+    
+    def changes_since(self, version):
+        """Return the (inserted, updated, deleted) record ids since version,
+        each id once, or None if version is unknown or too old"""
+        # Also places a client that is up to date with what this worker holds
+        current = int(self.version())
+        if not version.isdigit() or int(version) > current:
+            return None
+        position = bisect.bisect_right(self.checkpoints, (int(version), math.inf)) - 1
+        if position < 0:
+            return None
+        since = self.checkpoints[position][1]
+        oldest = self.entries[0][0] - 1 if self.entries else self.counter
+        if since < oldest:
+            return None
+        
+        newer = []
+        for entry in reversed(self.entries):
+            if entry[0] <= since:
+                break
+            newer.append(entry)
+        # The earliest change to each id tells whether it existed at version
+        first_kinds = {}
+        for _, record_id, kind in reversed(newer):
+            first_kinds.setdefault(record_id, kind)
+        inserted, updated, deleted = [], [], []
+        for record_id, kind in first_kinds.items():
+            existed = kind != 'insert'
+            exists = record_ids.position(record_id) is not None
+            if exists:
+                (updated if existed else inserted).append(record_id)
+            elif existed:
+                deleted.append(record_id)
+        return inserted, updated, deleted
+
+change_log = ChangeLog()
+
+# Derived structures kept in step with the cached dataset. Each provides
+# rebuild(records) for a full reload and apply(index, old_record, new_record)
+# for a single add (old is None), update or delete (new is None) at index.
+_dataset_indexes = [record_ids, change_log, aggregates, search_index, facets]
+
+# Files coordinating worker processes that share the candidate storage
+DATA_LOCK_FILE = 'instance/data.lock'
+FLUSH_LOCK_FILE = 'instance/flush.lock'
+
+class SharedLock:
+    """A file lock (fcntl.flock) held across worker processes, plus a version stamp.
+
+    Callers always hold the matching in-process lock first, so only one thread
+    per process uses it at a time and nested holds are simply counted. A shared
+    hold inside an exclusive one is a no-op. Writers bump a counter stored in
+    the file, which tells every other worker its cached view is out of date.
+    Without fcntl the lock does nothing and the stamp is a local counter.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._pid = None
+        self._depth = 0
+        self._local_stamp = 0
+    
+    def _file(self):
+        # A descriptor inherited across fork shares its lock with the parent,
+        # so each worker opens its own
+        if self._fd is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+            self._depth = 0
+        return self._fd
+    
+    def acquire(self, exclusive=True, blocking=True):
+        """Take the lock; returns False if blocking is False and another process holds it"""
+        if fcntl is None:
+            return True
+        fd = self._file()
+        if self._depth == 0:
+            flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            try:
+                fcntl.flock(fd, flags if blocking else flags | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+        self._depth += 1
+        return True
     
-    # Clear existing data (except headers)
-    for row in range(sheet.max_row, 1, -1):
-        sheet.delete_rows(row)
+    def release(self):
+        if fcntl is None:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+    
+    @contextmanager
+    def shared(self):
+        self.acquire(exclusive=False)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    @contextmanager
+    def exclusive(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def stamp(self):
+        """Return the version stamp, which changes whenever any worker writes"""
+        if fcntl is None:
+            return self._local_stamp
+        try:
+            return int(os.pread(self._file(), 20, 0) or 0)
+        except ValueError:
+            # Read while another worker was writing it; reads as a change
+            return -1
+    
+    def bump(self):
+        """Advance the version stamp (caller holds the lock exclusively)"""
+        if fcntl is None:
+            self._local_stamp += 1
+            return
+        os.pwrite(self._file(), b'%020d' % (max(self.stamp(), 0) + 1), 0)
+
+# In-memory cache of the parsed candidate records, shared by all request threads.
+# It is keyed on the shared version stamp together with the storage signature
+# (file mtimes/sizes for the workbook and journal, a change counter for SQLite),
+# so writes by other workers and external changes are picked up on the next
+# read, and it is refreshed in place by save_data() and the mutations below.
+_data_lock = threading.RLock()
+# Serializes workbook writes; always taken before _data_lock
+_flush_lock = threading.Lock()
+# Cross-process counterparts, each taken after its in-process lock: storage is
+# read under the shared data lock and written under the exclusive one, and one
+# worker at a time flushes the journal
+shared_data_lock = SharedLock(DATA_LOCK_FILE)
+shared_flush_lock = SharedLock(FLUSH_LOCK_FILE)
+_data_cache = {'signature': None, 'headers': None, 'records': None}
+_data_version = 0
+
+def _storage_signature():
+    """Identify the stored dataset: the shared version stamp and the storage signature"""
+    return (shared_data_lock.stamp(), storage.signature())
+
+def _store_cache(headers, records):
+    """Replace the cached dataset, held as a CandidateTable, and bump the dataset version"""
+    global _data_version
+    _data_cache['signature'] = _storage_signature()
+    if RECORD_ID_FIELD not in headers:
+        headers = headers + [RECORD_ID_FIELD]
+    if not isinstance(records, CandidateTable):
+        records = CandidateTable(headers, records)
+    records.add_column(RECORD_ID_FIELD)
+    _data_cache['headers'] = headers
+    _data_cache['records'] = records
+    _data_version += 1
+    with timed('index_build'):
+        for index in _dataset_indexes:
+            index.rebuild(records)
+
+def _assign_missing_ids():
+    """Give records without a unique id a new one, persisted like any other
+    update (caller holds _data_lock and shared_data_lock exclusively). Only
+    data from before ids existed, or rows added to the workbook by hand, need
+    this."""
+    entries = [{'op': 'update', 'index': position, 'changes': {RECORD_ID_FIELD: _new_record_id()}}
+               for position in record_ids.missing()]
+    if entries:
+        _mutate(entries)
+
+def get_data_version():
+    """Return a value that changes whenever the dataset changes, the same in every worker"""
+    with _data_lock:
+        _ensure_cache()
+        if ASYNC_WRITES:
+            # Changes reach storage only once the background writer gets to them, so
+            # count them in memory; this mode runs a single worker
+            return f"{_data_cache['signature']}:{_data_version}"
+        return _data_cache['signature']
+
+def _cache_is_current():
+    return _data_cache['records'] is not None and _data_cache['signature'] == _storage_signature()
+
+def _refresh_cache():
+    """Bring the cache up to date with storage (caller holds _data_lock and
+    shared_data_lock); returns True if the whole dataset was read again"""
+    if _cache_is_current():
+        return False
+    entries = storage.read_new() if _data_cache['records'] is not None else None
+    if entries is None:
+        _store_cache(*storage.read())
+        return True
+    # Another worker only appended changes; replay them rather than reloading
+    _apply_to_cache(entries)
+    _data_cache['signature'] = _storage_signature()
+    return False
+
+def _ensure_cache():
+    """Make sure the cache reflects the stored data (caller holds _data_lock)"""
+    if _cache_is_current():
+        return
+    with shared_data_lock.shared():
+        reloaded = _refresh_cache()
+    if reloaded and record_ids.missing():
+        with shared_data_lock.exclusive():
+            _refresh_cache()
+            _assign_missing_ids()
+
+@contextmanager
+def _write_access():
+    """Hold the data locks for a write, with the cache brought up to date under them"""
+    with _data_lock, shared_data_lock.exclusive():
+        _ensure_cache()
+        yield
+
+# Load data from Excel
+def load_data():
+    """Return a copy of all candidate records, reading storage only if it changed"""
+    with _data_lock:
+        _ensure_cache()
+        # Rows are built from the columns, so each caller gets its own copies
+        return list(_data_cache['records'])
+
+@contextmanager
+def _persisted_access():
+    """Hold _data_lock with no mutations waiting for the background writer, so
+    the cache holds nothing that storage has not journaled"""
+    while True:
+        flush_writes()
+        _data_lock.acquire()
+        if not _write_queue.unfinished_tasks:
+            break
+        # More were queued before the lock was taken; let the writer catch up
+        _data_lock.release()
+    try:
+        yield
+    finally:
+        _data_lock.release()
+
+# Save data to Excel
+def save_data(data):
+    """Replace all candidate records, writing them once in the desired header order"""
+    with _flush_lock, shared_flush_lock.exclusive(), _persisted_access(), _write_access():
+        _store_cache(*storage.replace(_data_cache['headers'], data))
+        shared_data_lock.bump()
+        _data_cache['signature'] = _storage_signature()
+        _assign_missing_ids()
+
+def export_excel(path=EXCEL_FILE):
+    """Write the current candidate records to a workbook"""
+    with _data_lock:
+        _ensure_cache()
+        headers = _ordered_headers(_data_cache['headers'])
+        rows = list(_data_cache['records'].value_rows(headers))
+    _write_workbook(path, headers, rows)
+
+def flush_journal():
+    """Fold pending journal entries into the workbook in one write.
+
+    The snapshot is taken under the data lock but the workbook is written
+    outside it, so requests keep journaling mutations while the flush runs;
+    only moving it into place and trimming the journal lock out other
+    workers. If another worker is already flushing, this one skips.
+    """
+    with _flush_lock:
+        if not shared_flush_lock.acquire(blocking=False):
+            return
+        try:
+            # A snapshot holding queued writes would be stamped with an older
+            # journal sequence, and replaying the journal would apply them twice
+            with _persisted_access():
+                _ensure_cache()
+                snapshot = storage.prepare_flush(_data_cache['headers'], _data_cache['records'])
+                if snapshot is None:
+                    return
+            
+            written = storage.write_flush(snapshot)
+            
+            with _write_access():
+                # The cache now also holds what other workers journaled during the write
+                _data_cache['headers'] = storage.finish_flush(snapshot, written)
+                shared_data_lock.bump()
+                _data_cache['signature'] = _storage_signature()
+        finally:
+            shared_flush_lock.release()
+
+_flush_event = threading.Event()
+_flusher_thread = None
+
+def _journal_flusher():
+    """Background loop that flushes the journal on an interval or when signalled"""
+    while True:
+        _flush_event.wait(JOURNAL_FLUSH_INTERVAL)
+        _flush_event.clear()
+        try:
+            flush_journal()
+        except Exception as e:
+            print(f"Journal flush failed: {e}")
+
+def start_journal_flusher():
+    """Start the background journal flusher if it is not already running"""
+    global _flusher_thread
+    with _data_lock:
+        if _flusher_thread is None or not _flusher_thread.is_alive():
+            _flusher_thread = threading.Thread(target=_journal_flusher, name='journal-flusher', daemon=True)
+            _flusher_thread.start()
+
+def _apply_to_cache(entries):
+    """Apply stored mutations to the cached dataset and its indexes, in order
+    (caller holds _data_lock)"""
+    global _data_version
+    records = _data_cache['records']
+    for entry in entries:
+        old_record = records[entry['index']] if entry['op'] != 'add' else None
+        _apply_mutation(records, entry)
+        if entry['op'] == 'add':
+            position, new_record = len(records) - 1, records[-1]
+        elif entry['op'] == 'update':
+            position, new_record = entry['index'], records[entry['index']]
+        else:
+            position, new_record = entry['index'], None
+        for index in _dataset_indexes:
+            index.apply(position, old_record, new_record)
+    _data_version += 1
+
+def _mutate(entries):
+    """Persist a batch of mutations in one storage write and apply them to the
+    cached dataset (caller holds _write_access()). With ASYNC_WRITES they are
+    applied at once and queued for the background writer instead."""
+    if ASYNC_WRITES:
+        _apply_to_cache(entries)
+        ticket = _queue_write(entries)
+        if has_request_context():
+            g.write_ticket = ticket
+        return
     
-    # Add updated data
-    for row_num, row_data in enumerate(data, 2):
-        for col_num, header in enumerate(ordered_headers, 1):
-            # Migrate old "Initial Remarks" to "Initial Screening"
-            if header == 'Initial Screening':
-                value = row_data.get('Initial Screening') or row_data.get('Initial Remarks', '')
+    storage.apply(entries)
+    _after_storage_write()
+    _apply_to_cache(entries)
+    _data_cache['signature'] = _storage_signature()
+
+def _after_storage_write():
+    """Announce a storage write to other workers and schedule a journal flush"""
+    shared_data_lock.bump()
+    if storage.pending:
+        start_journal_flusher()
+        if storage.pending >= JOURNAL_FLUSH_THRESHOLD:
+            _flush_event.set()
+
+# Mutations applied in memory but not yet persisted, as (ticket, entries) in
+# the order they were applied, and the status of recent tickets
+_write_queue = queue.Queue()
+_write_tickets = OrderedDict()
+_writer_thread = None
+
+def _queue_write(entries):
+    """Queue mutations for the background writer and return their ticket (caller holds _data_lock)"""
+    global _writer_thread
+    ticket = secrets.token_hex(8)
+    _write_tickets[ticket] = {"status": "queued", "queued_at": time.time()}
+    while len(_write_tickets) > WRITE_TICKET_LIMIT:
+        _write_tickets.popitem(last=False)
+    _write_queue.put((ticket, entries))
+    if _writer_thread is None or not _writer_thread.is_alive():
+        _writer_thread = threading.Thread(target=_background_writer, name='background-writer', daemon=True)
+        _writer_thread.start()
+    return ticket
+
+def _take_queued():
+    """Remove and return everything still in the write queue, marking it done
+    (caller holds _data_lock, so nothing is queued meanwhile)"""
+    taken = []
+    while True:
+        try:
+            taken.append(_write_queue.get_nowait())
+        except queue.Empty:
+            return taken
+        _write_queue.task_done()
+
+def _persist_queued(batch):
+    """Persist queued mutations in one storage write, in the order they were applied"""
+    # Journal them before the cache is brought up to date, since reloading it
+    # would drop mutations that are still to be written
+    with _data_lock, shared_data_lock.exclusive():
+        current = _cache_is_current()
+        if not current:
+            # Storage changed underneath; write everything the cache is ahead by
+            # now, then read it again
+            batch = batch + _take_queued()
+        try:
+            storage.apply([entry for _, entries in batch for entry in entries])
+        except Exception as e:
+            # The cache is ahead of storage; drop it so the next read reloads what was
+            # stored, along with the queued writes that were based on it
+            _data_cache['records'] = None
+            for ticket, _ in batch + _take_queued():
+                if ticket in _write_tickets:
+                    _write_tickets[ticket].update(status="failed", error=str(e))
+            print(f"Background write failed: {e}")
+            return
+        _after_storage_write()
+        if current:
+            # The cache already holds these and any later queued mutations
+            _data_cache['signature'] = _storage_signature()
+        else:
+            _data_cache['records'] = None
+        for ticket, _ in batch:
+            if ticket in _write_tickets:
+                _write_tickets[ticket].update(status="written", written_at=time.time())
+
+def _background_writer():
+    """Persist queued mutations, grouping everything queued meanwhile into one write"""
+    while True:
+        batch = [_write_queue.get()]
+        while True:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _persist_queued(batch)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+def get_write_status(ticket):
+    """Return the status of a write ticket, or None if it is unknown or expired"""
+    with _data_lock:
+        status = _write_tickets.get(ticket)
+        return dict(status) if status else None
+
+def flush_writes():
+    """Wait until every queued mutation has been persisted"""
+    if _writer_thread is not None and _writer_thread.is_alive():
+        _write_queue.join()
+
+@atexit.register
+def _flush_on_shutdown():
+    """Persist queued writes and fold the journal into the workbook before exiting"""
+    if _data_cache['records'] is None:
+        return
+    try:
+        flush_writes()
+        flush_journal()
+    except Exception as e:
+        print(f"Flush on shutdown failed: {e}")
+
+class StaleRecordError(Exception):
+    """Raised when a write names a revision of a record that is no longer current"""
+    
+    def __init__(self, record_id, revision):
+        super().__init__(f"Record {record_id} was changed by someone else; reload it and try again")
+        self.record_id = record_id
+        self.revision = revision
+
+def _locate(record_id, revision=None):
+    """Return the position of a record, or None if there is no such record
+    (caller holds _data_lock). Raises StaleRecordError if revision is given
+    and the record has changed since."""
+    position = record_ids.position(record_id)
+    if position is not None and revision:
+        current = record_ids.revision(_data_cache['records'][position])
+        if current != revision:
+            raise StaleRecordError(record_id, current)
+    return position
+
+def append_record(record):
+    """Add one record without rewriting the stored dataset; returns its id"""
+    return append_records([record])[0]
+
+def append_records(records):
+    """Add many records in a single storage write; returns their ids"""
+    with _write_access():
+        headers = _data_cache['headers']
+        records = [dict(_normalize_record(record, headers), **{RECORD_ID_FIELD: _new_record_id()})
+                   for record in records]
+        _mutate([{'op': 'add', 'record': record} for record in records])
+        return [record[RECORD_ID_FIELD] for record in records]
+
+def get_record(record_id):
+    """Return (record, revision) for a record id, or (None, None)"""
+    with _data_lock:
+        _ensure_cache()
+        position = record_ids.position(record_id)
+        if position is None:
+            return None, None
+        record = _data_cache['records'][position]
+        return record, record_ids.revision(record)
+
+def update_record(record_id, changes, revision=None):
+    """Update fields of a record; returns its new revision, or None if there is no such record.
+
+    If revision is given the update is only applied to that revision of the
+    record, otherwise StaleRecordError is raised.
+    """
+    with _write_access():
+        position = _locate(record_id, revision)
+        if position is None:
+            return None
+        changes = _normalize_changes(changes, _data_cache['headers'])
+        _mutate([{'op': 'update', 'index': position, 'changes': changes}])
+        return record_ids.revision(_data_cache['records'][position])
+
+def apply_batch(operations):
+    """Validate and apply a list of create/update/delete operations in one storage write.
+
+    Updates and deletes name a record by id, optionally with the revision they
+    expect. Multiple updates to one record are merged, and deleted records are
+    not updated. Raises ValueError (or StaleRecordError) without changing
+    anything if an operation is invalid; returns the number of records
+    created, updated and deleted, and the ids of the created records.
+    """
+    with _write_access():
+        headers = _data_cache['headers']
+        updates, creates, deletes = {}, [], set()
+        
+        for number, operation in enumerate(operations):
+            op = operation.get('op') if isinstance(operation, dict) else None
+            if op not in ('create', 'update', 'delete'):
+                raise ValueError(f"Operation {number}: op must be create, update or delete")
+            if op != 'create':
+                record_id = operation.get('id')
+                position = _locate(record_id, operation.get('rev')) if isinstance(record_id, str) else None
+                if position is None:
+                    raise ValueError(f"Operation {number}: no record found with id {record_id}")
+            if op != 'delete' and not isinstance(operation.get('data'), dict):
+                raise ValueError(f"Operation {number}: data must be an object")
+            
+            if op == 'create':
+                record = _normalize_record(operation['data'], headers)
+                record[RECORD_ID_FIELD] = _new_record_id()
+                creates.append(record)
+            elif op == 'update':
+                updates.setdefault(position, {}).update(
+                    _normalize_changes(_coerce_changes(operation['data']), headers))
+            elif position in deletes:
+                raise ValueError(f"Operation {number}: record {record_id} is already deleted")
             else:
-                value = row_data.get(header, '')
-            sheet.cell(row=row_num, column=col_num).value = value
+                deletes.add(position)
+        
+        entries = [{'op': 'update', 'index': position, 'changes': changes}
+                   for position, changes in updates.items() if position not in deletes]
+        entries += [{'op': 'add', 'record': record} for record in creates]
+        # Delete from the highest position down so earlier positions stay valid
+        entries += [{'op': 'delete', 'index': position} for position in sorted(deletes, reverse=True)]
+        _mutate(entries)
+        return {"created": len(creates), "updated": len(entries) - len(creates) - len(deletes),
+                "deleted": len(deletes), "ids": [record[RECORD_ID_FIELD] for record in creates]}
+
+def delete_record(record_id, revision=None):
+    """Delete a record; returns False if there is no such record.
+
+    If revision is given the record is only deleted at that revision,
+    otherwise StaleRecordError is raised.
+    """
+    with _write_access():
+        position = _locate(record_id, revision)
+        if position is None:
+            return False
+        _mutate([{'op': 'delete', 'index': position}])
+        return True
+
+class ConnectionPool:
+    """A small pool of SQLite connections in WAL mode, reused across requests.
+
+    Reusing connections also reuses sqlite3's per-connection cache of
+    prepared statements. WAL lets readers run alongside a writer.
+    """
+    
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = None
     
-    # Save the workbook
-    wb.save(EXCEL_FILE)
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # Durable at each checkpoint rather than each commit, which WAL keeps consistent
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; writes should run inside `with conn:` so they commit"""
+        with self._lock:
+            # Connections must not be carried across fork, so each worker starts its own pool
+            if self._pid != os.getpid():
+                self._idle, self._pid = [], os.getpid()
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                if len(self._idle) < self.size and self._pid == os.getpid():
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+user_db = ConnectionPool(USER_DB)
+
+# username -> (expiry, user) for recent lookups; only existing users are cached
+_user_cache = {}
+
+def get_user(username):
+    """Return {'id', 'password_hash', 'is_admin'} for a username, or None.
+
+    Lookups are cached for USER_CACHE_TTL seconds; changes made through this
+    process clear the entry at once, other workers see them after the TTL.
+    """
+    cached = _user_cache.get(username)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    with user_db.connection() as conn:
+        row = conn.execute('SELECT id, password_hash, is_admin FROM users WHERE username = ?',
+                           (username,)).fetchone()
+    if row is None:
+        _user_cache.pop(username, None)
+        return None
+    user = {'id': row[0], 'password_hash': row[1], 'is_admin': bool(row[2])}
+    _user_cache[username] = (time.monotonic() + USER_CACHE_TTL, user)
+    return user
+
+def _forget_user(username):
+    """Drop a cached user lookup after the user changes"""
+    _user_cache.pop(username, None)
 
 # Initialize user database
 def init_user_db():
     """Initialize the user database with admin user"""
     os.makedirs('instance', exist_ok=True)
-    conn = sqlite3.connect(USER_DB)
-    cursor = conn.cursor()
-    
-    # Create users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            is_admin INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Check if admin user exists
-    cursor.execute('SELECT COUNT(*) FROM users WHERE username = ?', (ADMIN_USERNAME,))
-    if cursor.fetchone()[0] == 0:
-        # Create default admin user
+    with user_db.connection() as conn, conn:
+        # Create users table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                is_admin INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Create default admin user if missing (another worker may be doing the same)
         password_hash = hashlib.sha256(ADMIN_PASSWORD.encode()).hexdigest()
-        cursor.execute('''
-            INSERT INTO users (username, password_hash, is_admin)
+        conn.execute('''
+            INSERT OR IGNORE INTO users (username, password_hash, is_admin)
             VALUES (?, ?, 1)
         ''', (ADMIN_USERNAME, password_hash))
-        conn.commit()
-    
-    conn.close()
 
 # Hash password
 def hash_password(password):
@@ -306,7 +2375,7 @@ def verify_password(password, password_hash):
 # Check if user is admin
 def is_admin():
     """Check if the current user is an admin"""
-    return session.get('is_admin', False)
+    return _session_is_admin()
 
 # Login route
 @app.route('/login', methods=['GET', 'POST'])
@@ -317,16 +2386,13 @@ def login():
         password = request.form['password']
         
         # Check against database
-        conn = sqlite3.connect(USER_DB)
-        cursor = conn.cursor()
-        cursor.execute('SELECT password_hash, is_admin FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
-        conn.close()
+        user = get_user(username)
         
-        if user and verify_password(password, user[0]):
+        if user and verify_password(password, user['password_hash']):
             session['logged_in'] = True
             session['username'] = username
-            session['is_admin'] = bool(user[1])
+            session['user_id'] = user['id']
+            session['is_admin'] = user['is_admin']
             return redirect(url_for('index'))
         else:
             error = 'Invalid credentials. Please try again.'
@@ -338,6 +2404,7 @@ def login():
 def logout():
     session.pop('logged_in', None)
     session.pop('username', None)
+    session.pop('user_id', None)
     session.pop('is_admin', None)
     return redirect(url_for('login'))
 
@@ -350,106 +2417,757 @@ def login_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+def _session_is_admin():
+    """Check the session's admin flag against the user table, so removed or
+    demoted admins lose access"""
+    if not session.get('logged_in') or not session.get('is_admin'):
+        return False
+    user = get_user(session.get('username'))
+    return user is not None and bool(user['is_admin'])
+
 # Check if user is admin (decorator)
 def admin_required(f):
     def decorated_function(*args, **kwargs):
         if not session.get('logged_in'):
             return redirect(url_for('login'))
-        if not session.get('is_admin'):
+        if not _session_is_admin():
             return jsonify({"status": "error", "message": "Admin access required"}), 403
         return f(*args, **kwargs)
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+# cProfile can only profile one request at a time per process
+_profiler_lock = threading.Lock()
+PROFILE_ID = re.compile(r'^\d{8}T\d{6}-[0-9a-f]{6}$')
+
+@app.before_request
+def start_profiler():
+    """Run the request under cProfile when an admin asks for it with
+    ?profile=1 or an X-Profile: 1 header"""
+    if request.args.get('profile') != '1' and request.headers.get('X-Profile') != '1':
+        return
+    if not _session_is_admin():
+        return
+    if not _profiler_lock.acquire(blocking=False):
+        g.profile_busy = True
+        return
+    g.profile_start = time.perf_counter()
+    g.profiler = cProfile.Profile()
+    g.profiler.enable()
+
+# Registered before the timing and compression hooks so it runs after them
+@app.after_request
+def save_profile(response):
+    """Store the request's profile and name it in an X-Profile-Id header"""
+    if g.pop('profile_busy', False):
+        response.headers['X-Profile-Id'] = 'busy'
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    try:
+        profiler.disable()
+        elapsed = time.perf_counter() - g.profile_start
+        response.headers['X-Profile-Id'] = _store_profile(profiler, response, elapsed)
+    finally:
+        _profiler_lock.release()
+    return response
+
+@app.teardown_request
+def stop_profiler(exc):
+    # The request failed before save_profile ran
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profiler_lock.release()
+
+def _store_profile(profiler, response, elapsed):
+    """Write a profile and its metadata to PROFILE_DIR and return its id"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(3)}"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, profile_id + '.prof'))
+    metadata = {
+        'id': profile_id,
+        'method': request.method,
+        'route': request.url_rule.rule if request.url_rule is not None else None,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(elapsed * 1000, 2),
+        'user': session.get('username'),
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(os.path.join(PROFILE_DIR, profile_id + '.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+    
+    # Ids start with the timestamp, so the oldest sort first
+    stored = sorted(name[:-len('.json')] for name in os.listdir(PROFILE_DIR) if name.endswith('.json'))
+    for old_id in stored[:-PROFILE_LIMIT] if PROFILE_LIMIT > 0 else stored:
+        for suffix in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, old_id + suffix))
+            except FileNotFoundError:
+                pass
+    return profile_id
+
+# Answer conditional GETs from the dataset version (decorator)
+def versioned(f):
+    """Tag responses with an ETag derived from the dataset version and reply
+    304 Not Modified when the client already holds that version.
+
+    The tag also covers the full request path and the user's role, since both
+    change what the route returns.
+    """
+    def decorated_function(*args, **kwargs):
+        key = f"{get_data_version()}:{is_admin()}:{request.full_path}"
+        etag = hashlib.sha1(key.encode()).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        # Always revalidate, and never share across users or encodings
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.update(['Cookie', 'Accept-Encoding'])
+        return response
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.server_timing = {}
+
+# Registered before compress_response so it runs after it and includes compression
+@app.after_request
+def record_request_timing(response):
+    """Record the request in /metrics and report its phases in a Server-Timing header"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    # Label by route pattern, not path, so record ids do not each get a series
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.observe_request(request.method, route, response.status_code, elapsed)
+    
+    timings = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in g.get('server_timing', {}).items()]
+    timings.append(f'total;dur={elapsed * 1000:.2f}')
+    response.headers['Server-Timing'] = ', '.join(timings)
+    return response
+
+# Smallest JSON body worth compressing, in bytes
+COMPRESSION_MIN_SIZE = 1024
+
+@app.after_request
+def compress_response(response):
+    """Compress large JSON responses with brotli or gzip when the client accepts it"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+    
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        with timed('compress'):
+            response.set_data(brotli.compress(body, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        with timed('compress'):
+            response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        return response
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/')
 @login_required
 def index():
     return render_template('index.html')
 
+def _parse_column_filters(args):
+    """Collect filter[<column>]=<value> query parameters into a dict"""
+    return {key[len('filter['):-1]: value for key, value in args.items()
+            if key.startswith('filter[') and key.endswith(']')}
+
+def _filter_positions(records, filters):
+    """Return the positions of the records whose columns contain every filter value, ignoring case"""
+    positions = range(len(records))
+    for column, value in filters.items():
+        needle = value.casefold()
+        matches = records.map_column(column, lambda text: needle in text.casefold())
+        positions = [position for position in positions if matches[position]]
+    return list(positions)
+
+def _sort_positions(records, positions, column, descending=False):
+    """Sort record positions by a column in place; numeric values sort before text
+    in either direction, so blanks always end up last"""
+    def key(value):
+        if column in NUMERIC_COLUMNS:
+            try:
+                return (0, float(value), '')
+            except ValueError:
+                pass
+        return (1, 0, value.casefold())
+    keys = records.map_column(column, key)
+    positions.sort(key=lambda position: keys[position][1:], reverse=descending)
+    positions.sort(key=lambda position: keys[position][0])
+
+def _requested_columns(*extra_columns):
+    """Read the fields and filter[<column>] query parameters for the current user.
+
+    Returns (fields, filters, unavailable): fields is None for all columns,
+    and unavailable names a requested filter (or extra) column that a
+    non-admin user may not see.
+    """
+    allowed_fields = None if is_admin() else NON_ADMIN_FIELDS
+    fields = [field for field in request.args.get('fields', '').split(',') if field] or allowed_fields
+    if allowed_fields:
+        fields = [field for field in fields if field in allowed_fields]
+    filters = _parse_column_filters(request.args)
+    
+    if allowed_fields:
+        for column in list(filters) + [column for column in extra_columns if column]:
+            if column not in allowed_fields:
+                return fields, filters, column
+    return fields, filters, None
+
 @app.route('/api/data', methods=['GET'])
 @login_required
+@versioned
 def get_data():
-    data = load_data()
+    """List candidates.
+
+    Optional query parameters: page and limit for pagination, sort and
+    order (asc/desc), filter[<column>]=<text> for case-insensitive contains
+    filters, and fields (comma separated) for column projection. Non-admin
+    users are always limited to NON_ADMIN_FIELDS. The response carries the
+    filtered total and each returned row's id and revision for
+    PUT/PATCH/DELETE /api/data/<id>, and the change version to pass to
+    /api/data/changes or /api/data/stream.
+    """
     is_admin_user = is_admin()  # Check if the user is an admin
-    return jsonify({"data": data, "is_admin": is_admin_user})
+    sort_column = request.args.get('sort')
+    descending = request.args.get('order', 'asc').lower() == 'desc'
+    page = request.args.get('page', 1, type=int)
+    limit = request.args.get('limit', type=int)
+    
+    if page < 1 or (limit is not None and limit < 1):
+        return jsonify({"status": "error", "message": "page and limit must be positive integers"}), 400
+    fields, filters, unavailable = _requested_columns(sort_column)
+    if unavailable:
+        return jsonify({"status": "error", "message": f"Column {unavailable} not available"}), 403
+    
+    # Filter and sort on the columns; only the rows sent are built
+    with _data_lock:
+        _ensure_cache()
+        records = _data_cache['records']
+        positions = _filter_positions(records, filters)
+        if sort_column:
+            _sort_positions(records, positions, sort_column, descending)
+        total = len(positions)
+        if limit:
+            positions = positions[(page - 1) * limit:page * limit]
+        rows = list(records.iter_rows(positions))
+        revisions = [record_ids.revision(record) for record in rows]
+        version = change_log.version()
+    
+    response = {
+        "data": [{field: record.get(field, '') for field in fields} for record in rows] if fields else rows,
+        "is_admin": is_admin_user,
+        "total": total,
+        "ids": [record.get(RECORD_ID_FIELD, '') for record in rows],
+        "revisions": revisions,
+        "version": version
+    }
+    if limit:
+        response.update(page=page, limit=limit)
+    return jsonify(response)
+
+def _changes_since(version, fields):
+    """Body for /api/data/changes and /api/data/stream (caller holds _data_lock)"""
+    changes = change_log.changes_since(version)
+    if changes is None:
+        # Unknown or expired version: the client has to load the table again
+        return {"version": change_log.version(), "reset": True}
+    
+    inserted, updated, deleted = changes
+    records = _data_cache['records']
+    revisions = {record_id: record_ids.revision(records[record_ids.position(record_id)])
+                 for record_id in inserted + updated}
+    def rows(ids):
+        return list(records.iter_rows([record_ids.position(record_id) for record_id in ids], fields))
+    return {
+        "version": change_log.version(),
+        "reset": False,
+        "inserted": rows(inserted),
+        "updated": rows(updated),
+        "deleted": deleted,
+        "revisions": revisions
+    }
+
+@app.route('/api/data/changes', methods=['GET'])
+@login_required
+def get_changes():
+    """Records inserted, updated and deleted since the version given by the since
+    query parameter, each listed once in its current state; reset is true if the
+    version is unknown to this worker or too old"""
+    fields, _, _ = _requested_columns()
+    with _data_lock:
+        _ensure_cache()
+        return jsonify(_changes_since(request.args.get('since', ''), fields))
+
+@app.route('/api/data/stream', methods=['GET'])
+@login_required
+def stream_changes():
+    """Push the body of /api/data/changes as Server-Sent Events whenever records
+    change. Starts at the since query parameter (or Last-Event-ID on reconnect),
+    or at the current version."""
+    fields, _, _ = _requested_columns()
+    with _data_lock:
+        _ensure_cache()
+        start = request.headers.get('Last-Event-ID') or request.args.get('since') or change_log.version()
+        start_counter = None if start != change_log.version() else change_log.counter
+    
+    def events():
+        version, counter = start, start_counter
+        last_sent = time.monotonic()
+        # Sent at once so the response headers go out; also the reconnect delay in ms
+        yield 'retry: 3000\n\n'
+        while True:
+            with _data_lock:
+                # Also picks up changes made by other workers
+                _ensure_cache()
+                body = None
+                if change_log.counter != counter or change_log.version() != version:
+                    counter = change_log.counter
+                    body = _changes_since(version, fields)
+                    if not (body['reset'] or body['inserted'] or body['updated'] or body['deleted']):
+                        # Nothing to send, but later polls start from here
+                        version = body['version']
+                        body = None
+            if body is not None:
+                version = body['version']
+                last_sent = time.monotonic()
+                yield f"id: {version}\nevent: changes\ndata: {json.dumps(body)}\n\n"
+            elif time.monotonic() - last_sent >= CHANGE_STREAM_KEEPALIVE:
+                last_sent = time.monotonic()
+                yield ': keep-alive\n\n'
+            with change_log.changed:
+                if change_log.counter == counter:
+                    change_log.changed.wait(CHANGE_STREAM_POLL)
+    
+    response = Response(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/search', methods=['GET'])
+@login_required
+@versioned
+def search_data():
+    """Full-text search over names, companies, skills, certifications and remarks.
+
+    Query parameters: q (every word must match, as a prefix), page and limit
+    (default 20). Results are ranked by relevance; non-admin users only
+    search and receive their visible columns.
+    """
+    query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    limit = request.args.get('limit', 20, type=int)
+    if page < 1 or limit < 1:
+        return jsonify({"status": "error", "message": "page and limit must be positive integers"}), 400
+    
+    is_admin_user = is_admin()
+    with _data_lock:
+        _ensure_cache()
+        hits, total = search_index.search(query, public_only=not is_admin_user, limit=page * limit)
+        records = _data_cache['records']
+        page_hits = hits[(page - 1) * limit:]
+        rows = [records[position] for position, _ in page_hits]
+    
+    if not is_admin_user:
+        rows = [{field: row.get(field, '') for field in NON_ADMIN_FIELDS} for row in rows]
+    return jsonify({
+        "data": rows,
+        "ids": [row.get(RECORD_ID_FIELD, '') for row in rows],
+        "scores": [score for _, score in page_hits],
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "is_admin": is_admin_user
+    })
+
+class _Echo:
+    """File-like object whose write() returns the data, for streaming csv.writer output"""
+    
+    def write(self, value):
+        return value
+
+def _stream_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(row)
+
+def _stream_xlsx(headers, rows, chunk_size=64 * 1024):
+    # openpyxl's write-only mode spools rows to disk, so memory stays flat;
+    # the zip container can only be sent once it is complete
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet(SHEET_NAME)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    with tempfile.TemporaryFile() as f:
+        wb.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+# Rows read from the cached table per hold of the data lock while exporting
+EXPORT_CHUNK_SIZE = 1000
+
+def _export_rows(headers, positions, ids, version):
+    """Yield the value rows of the records at positions, reading the live table
+    a chunk at a time under the data lock. If the dataset changes meanwhile,
+    the rest are found by id: deleted ones are left out and updated ones
+    exported as they are now."""
+    for start in range(0, len(positions), EXPORT_CHUNK_SIZE):
+        with _data_lock:
+            _ensure_cache()
+            chunk = positions[start:start + EXPORT_CHUNK_SIZE]
+            if _data_version != version:
+                chunk = [position for position in map(record_ids.position, ids[start:start + EXPORT_CHUNK_SIZE])
+                         if position is not None]
+            rows = list(_data_cache['records'].value_rows(headers, chunk))
+        yield from rows
+
+@app.route('/api/export', methods=['GET'])
+@login_required
+def export_data():
+    """Download candidates as CSV or XLSX, streamed row by row.
+
+    Query parameters: format (csv or xlsx, default csv), filter[<column>]=<text>
+    and fields, as for GET /api/data.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({"status": "error", "message": "format must be csv or xlsx"}), 400
+    fields, filters, unavailable = _requested_columns()
+    if unavailable:
+        return jsonify({"status": "error", "message": f"Column {unavailable} not available"}), 403
+    
+    with _data_lock:
+        _ensure_cache()
+        headers = fields or _ordered_headers(_data_cache['headers'])
+        positions = _filter_positions(_data_cache['records'], filters)
+        ids = [record_ids.ids[position] for position in positions]
+        version = _data_version
+    
+    rows = _export_rows(headers, positions, ids, version)
+    filename = f"candidates-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    if export_format == 'csv':
+        body, mimetype = _stream_csv(headers, rows), 'text/csv'
+    else:
+        body, mimetype = _stream_xlsx(headers, rows), 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+def _write_response(body):
+    """Reply to a mutation: 200, or 202 with a ticket if it was queued for the background writer"""
+    ticket = g.pop('write_ticket', None)
+    if ticket is None:
+        return jsonify(body)
+    response = jsonify(dict(body, ticket=ticket))
+    response.status_code = 202
+    response.headers['Location'] = url_for('write_status', ticket=ticket)
+    return response
+
+@app.route('/api/writes/<ticket>', methods=['GET'])
+@login_required
+def write_status(ticket):
+    """Status of a write acknowledged with 202: queued, written or failed"""
+    status = get_write_status(ticket)
+    if status is None:
+        return jsonify({"status": "error", "message": f"Unknown write ticket {ticket}"}), 404
+    return jsonify({"ticket": ticket, **status})
 
 @app.route('/api/data', methods=['POST'])
 @login_required
 def add_data():
     try:
         new_data = request.json
-        data = load_data()
-        data.append(new_data)
-        save_data(data)
-        return jsonify({"status": "success", "message": "Data added successfully"})
+        record_id = append_record(new_data)
+        return _write_response({"status": "success", "message": "Data added successfully", "id": record_id})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/api/data/<int:index>', methods=['PUT'])
-@login_required
-def update_data(index):
+# Rows validated per batch during a bulk import
+IMPORT_BATCH_SIZE = 500
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+def _iter_upload_rows(upload):
+    """Yield the rows of an uploaded .xlsx or .csv file as lists of values, streamed"""
+    filename = (upload.filename or '').lower()
+    if filename.endswith('.xlsx'):
+        try:
+            wb = openpyxl.load_workbook(upload.stream, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, InvalidFileException) as e:
+            raise ValueError(f"Could not read the workbook: {e}")
+        try:
+            sheet = wb[SHEET_NAME] if SHEET_NAME in wb.sheetnames else wb.worksheets[0]
+            for row in sheet.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            wb.close()
+    elif filename.endswith('.csv'):
+        # utf-8-sig drops the byte order mark Excel puts at the start of CSV exports
+        yield from csv.reader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''))
+    else:
+        raise ValueError("Upload a .xlsx or .csv file")
+
+def _map_import_headers(raw_headers, known_headers):
+    """Map uploaded column names onto stored headers, case-insensitively.
+
+    Returns (mapping, ignored) where mapping[i] is the stored header for
+    column i or None, and ignored lists the unrecognised column names.
+    """
+    by_name = {header.casefold(): header for header in known_headers}
+    # Migrate old "Initial Remarks" to "Initial Screening"
+    by_name['initial remarks'] = 'Initial Screening'
+    mapping, ignored = [], []
+    for raw in raw_headers:
+        name = _cell_text(raw).strip()
+        header = by_name.get(name.casefold())
+        mapping.append(header)
+        if header is None and name:
+            ignored.append(name)
+    return mapping, ignored
+
+def _validate_import_row(record):
+    """Return the validation errors for one imported record"""
+    errors = []
+    if not record.get('Name') and not record.get('Email ID'):
+        errors.append("Name or Email ID is required")
+    if record.get('Email ID') and not EMAIL_PATTERN.match(record['Email ID']):
+        errors.append(f"Invalid Email ID: {record['Email ID']}")
+    for col in NUMERIC_COLUMNS:
+        if record.get(col) and _numeric_value(record[col]) is None:
+            errors.append(f"{col} must be a number")
+    return errors
+
+@app.route('/api/import', methods=['POST'])
+@admin_required
+def import_data():
+    """Bulk import candidates from an uploaded .xlsx or .csv file (admin only).
+
+    Headers are matched by name, rows are validated in batches of
+    IMPORT_BATCH_SIZE, and every valid row is committed in one storage
+    write. Invalid rows are skipped and reported with their sheet row
+    number. Pass dry_run=1 to validate without saving.
+    """
     try:
-        update_data = request.json
-        data = load_data()
-        
-        # Check if index is valid
-        if 0 <= index < len(data):
-            # Update the data at the specified index
-            for key, value in update_data.items():
-                # Convert specific fields to appropriate types if necessary
-                if key in ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']:
-                    try:
-                        data[index][key] = int(value)
-                    except (ValueError, TypeError):
-                        data[index][key] = value  # Keep original if conversion fails
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({"status": "error", "message": "No file uploaded"}), 400
+        dry_run = (request.args.get('dry_run') or request.form.get('dry_run') or '').lower() in ('1', 'true', 'yes', 'on')
+        
+        with _data_lock:
+            _ensure_cache()
+            known_headers = list(_data_cache['headers'])
+        
+        rows = _iter_upload_rows(upload)
+        try:
+            mapping, ignored = _map_import_headers(next(rows), known_headers)
+        except StopIteration:
+            return jsonify({"status": "error", "message": "The uploaded file is empty"}), 400
+        
+        valid, errors, blank = [], [], 0
+        
+        def validate(batch):
+            for row_number, record in batch:
+                row_errors = _validate_import_row(record)
+                if row_errors:
+                    errors.append({"row": row_number, "errors": row_errors})
                 else:
-                    data[index][key] = value
-            
-            save_data(data)
-            return jsonify({"status": "success", "message": "Data updated successfully"})
+                    valid.append(record)
+        
+        batch = []
+        # Row 1 holds the headers
+        for row_number, row in enumerate(rows, 2):
+            record = {}
+            for header, value in zip(mapping, row):
+                if header:
+                    record[header] = _cell_text(value).strip()
+            if not any(record.values()):
+                blank += 1
+                continue
+            batch.append((row_number, record))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                validate(batch)
+                batch = []
+        validate(batch)
+        
+        if valid and not dry_run:
+            append_records(valid)
+        
+        return _write_response({
+            "status": "success",
+            "imported": 0 if dry_run else len(valid),
+            "valid": len(valid),
+            "skipped_blank": blank,
+            "errors": errors,
+            "ignored_columns": ignored,
+            "dry_run": dry_run
+        })
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def _coerce_changes(update_data):
+    """Convert specific fields of an update to appropriate types if necessary"""
+    changes = {}
+    for key, value in update_data.items():
+        if key in NUMERIC_COLUMNS:
+            try:
+                changes[key] = int(value)
+            except (ValueError, TypeError):
+                changes[key] = value  # Keep original if conversion fails
         else:
-            return jsonify({"status": "error", "message": f"No record found at index {index}"}), 404
+            changes[key] = value
+    return changes
+
+def _expected_revision(body=None):
+    """The record revision a write is based on, from If-Match or a _rev body field"""
+    if request.if_match and not request.if_match.star_tag:
+        return next(iter(request.if_match.as_set()), None)
+    if body:
+        return body.pop('_rev', None)
+    return None
+
+def _stale_response(error):
+    """409 Conflict for a write based on an outdated revision"""
+    return jsonify({"status": "error", "message": str(error), "revision": error.revision}), 409
+
+@app.route('/api/data/<record_id>', methods=['GET'])
+@login_required
+def get_record_data(record_id):
+    """Return one candidate, with its revision as a strong ETag"""
+    record, revision = get_record(record_id)
+    if record is None:
+        return jsonify({"status": "error", "message": f"No record found with id {record_id}"}), 404
+    if not is_admin():
+        record = {field: record.get(field, '') for field in NON_ADMIN_FIELDS}
+    response = jsonify({"data": record, "revision": revision})
+    response.set_etag(revision)
+    return response.make_conditional(request)
+
+# PATCH merges only the fields sent; PUT is kept for existing clients and behaves the same.
+# Either may send If-Match (or a _rev field) to only update the revision the client last saw.
+@app.route('/api/data/<record_id>', methods=['PUT', 'PATCH'])
+@login_required
+def update_data(record_id):
+    try:
+        body = dict(request.json)
+        revision = _expected_revision(body)
+        changes = _coerce_changes(body)
+        
+        # Update the record with this id if it exists
+        new_revision = update_record(record_id, changes, revision)
+        if new_revision is None:
+            return jsonify({"status": "error", "message": f"No record found with id {record_id}"}), 404
+        response = _write_response({"status": "success", "message": "Data updated successfully",
+                                    "revision": new_revision})
+        response.set_etag(new_revision)
+        return response
+    except StaleRecordError as e:
+        return _stale_response(e)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/api/data/<int:index>', methods=['DELETE'])
+@app.route('/api/data/batch', methods=['POST'])
 @login_required
-def delete_data(index):
+def batch_data():
+    """Apply a list of creates, updates and deletes atomically in one storage write.
+
+    Body: {"operations": [{"op": "create", "data": {...}},
+    {"op": "update", "id": id, "data": {...}}, {"op": "delete", "id": id}]};
+    updates and deletes may add "rev" to require that revision of the
+    record. If any operation is invalid or stale, nothing is applied.
+    """
     try:
-        data = load_data()
-        
-        # Check if index is valid
-        if 0 <= index < len(data):
-            # Delete the data at the specified index
-            del data[index]
-            save_data(data)
-            return jsonify({"status": "success", "message": "Data deleted successfully"})
+        operations = (request.json or {}).get('operations')
+        if not isinstance(operations, list) or not operations:
+            return jsonify({"status": "error", "message": "operations must be a non-empty list"}), 400
+        
+        counts = apply_batch(operations)
+        return _write_response({"status": "success", "message": "Batch applied successfully", **counts})
+    except StaleRecordError as e:
+        return _stale_response(e)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/data/<record_id>', methods=['DELETE'])
+@login_required
+def delete_data(record_id):
+    try:
+        # Delete the record with this id if it exists
+        if delete_record(record_id, _expected_revision()):
+            return _write_response({"status": "success", "message": "Data deleted successfully"})
         else:
-            return jsonify({"status": "error", "message": f"No record found at index {index}"}), 404
+            return jsonify({"status": "error", "message": f"No record found with id {record_id}"}), 404
+    except StaleRecordError as e:
+        return _stale_response(e)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/analysis/summary', methods=['GET'])
 @login_required
+@versioned
 def get_summary():
+    """Numeric column statistics.
+
+    Optional query parameters: percentiles=1 adds p25/p50/p90 per column,
+    hike=1 adds Expected/Current CTC ratio statistics under 'CTC Hike Ratio',
+    and histogram=<column> (with bins, default 10) adds server-side bins.
+    """
     try:
-        data = load_data()
-        if not data:
-            return jsonify({"status": "error", "message": "No data available"}), 404
+        histogram_column = request.args.get('histogram')
+        bins = request.args.get('bins', 10, type=int)
+        if histogram_column and histogram_column not in NUMERIC_COLUMNS:
+            return jsonify({"status": "error", "message": f"Column {histogram_column} is not numeric"}), 400
+        if bins < 1:
+            return jsonify({"status": "error", "message": "bins must be a positive integer"}), 400
         
-        # Get numerical columns (assuming columns with numeric values)
-        numeric_cols = ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']
-        
-        summary = {}
-        for col in numeric_cols:
-            values = [float(item[col]) for item in data if item[col] and item[col].replace('.', '', 1).isdigit()]
-            if values:
-                summary[col] = {
-                    "mean": sum(values) / len(values),
-                    "min": min(values),
-                    "max": max(values),
-                    "count": len(values)
-                }
+        with _data_lock:
+            _ensure_cache()
+            if not _data_cache['records']:
+                return jsonify({"status": "error", "message": "No data available"}), 404
+            with timed('analysis'):
+                records = _data_cache['records']
+                summary = analytics.summary(records)
+                
+                if request.args.get('percentiles'):
+                    for col, points in analytics.percentiles(records).items():
+                        summary[col].update(points)
+                if request.args.get('hike'):
+                    hike_ratio = analytics.hike_ratio(records)
+                    if hike_ratio:
+                        summary['CTC Hike Ratio'] = hike_ratio
+                if histogram_column:
+                    summary['histogram'] = analytics.histogram(records, histogram_column, bins)
         
         return jsonify(summary)
     except Exception as e:
@@ -457,48 +3175,147 @@ def get_summary():
 
 @app.route('/api/analysis/group/<column>', methods=['GET'])
 @login_required
+@versioned
 def group_analysis(column):
     try:
-        data = load_data()
-        if not data:
-            return jsonify({"status": "error", "message": "No data available"}), 404
-        
-        # Check if column exists
-        if not data or column not in data[0]:
-            return jsonify({"status": "error", "message": f"Column {column} not found"}), 400
-        
-        # Get numerical columns for aggregation
-        numeric_cols = ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']
-        
-        # Group by the specified column
-        grouped_data = {}
-        for item in data:
-            group_key = item.get(column, 'Unknown')
-            if group_key not in grouped_data:
-                grouped_data[group_key] = {col: [] for col in numeric_cols}
+        with _data_lock:
+            _ensure_cache()
+            if not _data_cache['records']:
+                return jsonify({"status": "error", "message": "No data available"}), 404
             
-            # Add numeric values to the appropriate group
-            for col in numeric_cols:
-                if item.get(col) and item[col].replace('.', '', 1).isdigit():
-                    grouped_data[group_key][col].append(float(item[col]))
-        
-        # Calculate averages for each group
-        result = []
-        for group_key, values in grouped_data.items():
-            group_result = {column: group_key}
-            for col, numbers in values.items():
-                if numbers:
-                    group_result[col + '_avg'] = sum(numbers) / len(numbers)
-                    group_result[col + '_count'] = len(numbers)
-                else:
-                    group_result[col + '_avg'] = 0
-                    group_result[col + '_count'] = 0
-            result.append(group_result)
+            # Check if column exists
+            if column not in _data_cache['headers']:
+                return jsonify({"status": "error", "message": f"Column {column} not found"}), 400
+            
+            with timed('analysis'):
+                groups = aggregates.group_sums(column, _data_cache['records'])
+                # Optional per-group p25/p50/p90 of each numeric column
+                group_percentiles = {}
+                if request.args.get('percentiles'):
+                    group_percentiles = analytics.group_percentiles(column, _data_cache['records'])
+            
+            # Calculate averages for each group
+            result = []
+            for group_key, group in groups.items():
+                group_result = {column: group_key}
+                for col, (total, count) in group['sums'].items():
+                    if count:
+                        group_result[col + '_avg'] = total / count
+                        group_result[col + '_count'] = count
+                    else:
+                        group_result[col + '_avg'] = 0
+                        group_result[col + '_count'] = 0
+                group_result.update(group_percentiles.get(group_key, {}))
+                result.append(group_result)
         
         return jsonify(result)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# Application Status values broken out per month on the analysis dashboard
+DASHBOARD_STATUSES = {'Accepted': 'accepted', 'Rejected': 'rejected', 'In Notice': 'in_notice', 'Joined': 'joined'}
+
+# Dashboard payload computed for one dataset version
+_dashboard_cache = {'version': None, 'payload': None}
+
+def _month_of(date_text):
+    """Return the 'YYYY-MM' month of a record's Date, or None if it does not parse"""
+    try:
+        return datetime.strptime(date_text[:10], '%Y-%m-%d').strftime('%Y-%m')
+    except ValueError:
+        return None
+
+def _build_dashboard(records):
+    """Compute every analysis-tab series in one pass over the records"""
+    counters = ['applicants'] + list(DASHBOARD_STATUSES.values()) + ['feedback_given']
+    months = {}
+    status_counts = Counter()
+    feedback_counts = {'All 3 Given': 0, '2 Given': 0, '1 Given': 0, '0 Given': 0}
+    
+    for record in records:
+        month = months.setdefault(_month_of(record.get('Date', '')), dict.fromkeys(counters, 0))
+        month['applicants'] += 1
+        status = record.get('Application Status', '')
+        status_counts[status] += 1
+        if status in DASHBOARD_STATUSES:
+            month[DASHBOARD_STATUSES[status]] += 1
+        
+        feedback = record.get('Reference Feedback', '')
+        if feedback:
+            month['feedback_given'] += 1
+        given = len([f for f in feedback.split(',') if f.strip()])
+        feedback_counts[{3: 'All 3 Given', 2: '2 Given', 1: '1 Given'}.get(given, '0 Given')] += 1
+    
+    # Sort months chronologically, undated records last
+    monthly = []
+    for key in sorted(months, key=lambda k: (k is None, k or '')):
+        label = datetime.strptime(key, '%Y-%m').strftime('%b %Y') if key else 'Unknown'
+        monthly.append(dict(months[key], month=key, label=label))
+    totals = {counter: sum(month[counter] for month in monthly) for counter in counters}
+    
+    return {
+        "monthly": monthly,
+        "totals": totals,
+        "status_counts": dict(status_counts),
+        "feedback_counts": feedback_counts,
+        "distribution": {month['label']: month['applicants'] for month in monthly}
+    }
+
+@app.route('/api/analysis/dashboard', methods=['GET'])
+@login_required
+@versioned
+def get_dashboard():
+    """All analysis-tab series in one response, computed once per dataset version"""
+    try:
+        with _data_lock:
+            _ensure_cache()
+            if _dashboard_cache['version'] != _data_version:
+                with timed('analysis'):
+                    _dashboard_cache['payload'] = _build_dashboard(_data_cache['records'].iter_rows(
+                        fields=['Date', 'Application Status', 'Reference Feedback']))
+                _dashboard_cache['version'] = _data_version
+            payload = _dashboard_cache['payload']
+        
+        return jsonify(payload)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/facets', methods=['GET'])
+@login_required
+@versioned
+def get_facets():
+    """Candidate counts per value of each categorical column.
+
+    Optional query parameters: columns (comma separated, default
+    FACET_COLUMNS) and filter[<column>]=<text>, as for GET /api/data, to
+    count only the matching candidates. Filters on facet columns are
+    answered from the facet index; others scan their column. Non-admin
+    users only get facets of their visible columns.
+    """
+    columns = [column for column in request.args.get('columns', '').split(',') if column] or FACET_COLUMNS
+    unknown = [column for column in columns if column not in FACET_COLUMNS]
+    if unknown:
+        return jsonify({"status": "error", "message": f"Column {unknown[0]} has no facets"}), 400
+    _, filters, unavailable = _requested_columns()
+    if unavailable:
+        return jsonify({"status": "error", "message": f"Column {unavailable} not available"}), 403
+    if not is_admin():
+        columns = [column for column in columns if column in NON_ADMIN_FIELDS]
+    
+    try:
+        with _data_lock:
+            _ensure_cache()
+            docs, remaining = facets.matching(filters)
+            if remaining:
+                scanned = facets.rows_at(_filter_positions(_data_cache['records'], remaining))
+                docs = scanned if docs is None else docs & scanned
+            return jsonify({
+                "total": len(_data_cache['records']) if docs is None else docs.bit_count(),
+                "facets": {column: facets.counts(column, docs) for column in columns}
+            })
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/dropdown-options', methods=['GET'])
 @login_required
 def get_dropdown_options():
@@ -609,11 +3426,8 @@ def users_page():
 @admin_required
 def get_users():
     """Get all users (admin only)"""
-    conn = sqlite3.connect(USER_DB)
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, username, is_admin, created_at FROM users ORDER BY created_at DESC')
-    users = cursor.fetchall()
-    conn.close()
+    with user_db.connection() as conn:
+        users = conn.execute('SELECT id, username, is_admin, created_at FROM users ORDER BY created_at DESC').fetchall()
     
     users_list = []
     for user in users:
@@ -639,23 +3453,17 @@ def add_user():
         if not username or not password:
             return jsonify({"status": "error", "message": "Username and password are required"}), 400
         
-        conn = sqlite3.connect(USER_DB)
-        cursor = conn.cursor()
-        
-        # Check if username already exists
-        cursor.execute('SELECT COUNT(*) FROM users WHERE username = ?', (username,))
-        if cursor.fetchone()[0] > 0:
-            conn.close()
-            return jsonify({"status": "error", "message": "Username already exists"}), 400
-        
-        # Add user
+        # Add user; the UNIQUE constraint rejects an existing username
         password_hash = hash_password(password)
-        cursor.execute('''
-            INSERT INTO users (username, password_hash, is_admin)
-            VALUES (?, ?, ?)
-        ''', (username, password_hash, 1 if is_admin_flag else 0))
-        conn.commit()
-        conn.close()
+        try:
+            with user_db.connection() as conn, conn:
+                conn.execute('''
+                    INSERT INTO users (username, password_hash, is_admin)
+                    VALUES (?, ?, ?)
+                ''', (username, password_hash, 1 if is_admin_flag else 0))
+        except sqlite3.IntegrityError:
+            return jsonify({"status": "error", "message": "Username already exists"}), 400
+        _forget_user(username)
         
         return jsonify({"status": "success", "message": "User added successfully"})
     except Exception as e:
@@ -670,41 +3478,92 @@ def delete_user(user_id):
         if user_id == session.get('user_id'):
             return jsonify({"status": "error", "message": "Cannot delete your own account"}), 400
         
-        conn = sqlite3.connect(USER_DB)
-        cursor = conn.cursor()
-        
-        # Check if user exists
-        cursor.execute('SELECT username FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
-        if not user:
-            conn.close()
-            return jsonify({"status": "error", "message": "User not found"}), 404
-        
-        # Prevent deleting admin user
-        cursor.execute('SELECT is_admin FROM users WHERE id = ?', (user_id,))
-        if cursor.fetchone()[0] == 1:
-            # Check if there are other admins
-            cursor.execute('SELECT COUNT(*) FROM users WHERE is_admin = 1 AND id != ?', (user_id,))
-            if cursor.fetchone()[0] == 0:
-                conn.close()
+        with user_db.connection() as conn, conn:
+            # Look up the user and count the other admins in one query
+            user = conn.execute('''
+                SELECT username, is_admin,
+                       (SELECT COUNT(*) FROM users WHERE is_admin = 1 AND id != ?)
+                FROM users WHERE id = ?
+            ''', (user_id, user_id)).fetchone()
+            if not user:
+                return jsonify({"status": "error", "message": "User not found"}), 404
+            
+            # Prevent deleting the last admin user
+            if user[1] == 1 and user[2] == 0:
                 return jsonify({"status": "error", "message": "Cannot delete the last admin user"}), 400
-        
-        # Delete user
-        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        conn.commit()
-        conn.close()
+            
+            # Delete user
+            conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
+        _forget_user(user[0])
         
         return jsonify({"status": "success", "message": "User deleted successfully"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """List stored request profiles, newest first"""
+    try:
+        profiles = []
+        if os.path.isdir(PROFILE_DIR):
+            for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+                if name.endswith('.json'):
+                    with open(os.path.join(PROFILE_DIR, name), encoding='utf-8') as f:
+                        profiles.append(json.load(f))
+        return jsonify({"profiles": profiles})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# Orderings accepted by GET /api/profiles/<id>?format=text
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+@admin_required
+def get_profile(profile_id):
+    """Download a stored profile as a .prof file for pstats or snakeviz, or
+    with format=text as the top functions (sort and limit query parameters)"""
+    path = os.path.abspath(os.path.join(PROFILE_DIR, profile_id + '.prof'))
+    if not PROFILE_ID.match(profile_id) or not os.path.exists(path):
+        return jsonify({"status": "error", "message": "Profile not found"}), 404
+    
+    if request.args.get('format') != 'text':
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=profile_id + '.prof')
+    
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in PROFILE_SORT_KEYS:
+        return jsonify({"status": "error", "message": f"sort must be one of {', '.join(PROFILE_SORT_KEYS)}"}), 400
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(request.args.get('limit', 40, type=int))
+    return Response(output.getvalue(), mimetype='text/plain')
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request and phase timings of this worker in the Prometheus text format.
+
+    Readable by admins, or by a scraper sending Authorization: Bearer <METRICS_TOKEN>.
+    """
+    authorization = request.headers.get('Authorization', '')
+    token_ok = (METRICS_TOKEN is not None and authorization.startswith('Bearer ')
+                and secrets.compare_digest(authorization[len('Bearer '):], METRICS_TOKEN))
+    if not token_ok and not _session_is_admin():
+        return jsonify({"status": "error", "message": "Admin access or metrics token required"}), 403
+    
+    gauges = [
+        ('candidate_records', 'Candidates held in this worker\'s cache.', len(_data_cache['records'] or [])),
+        ('journal_pending_entries', 'Journal entries not yet merged into storage.', storage.pending),
+    ]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     # Initialize user database
     init_user_db()
     # Apply header ordering to existing Excel data on startup
     try:
-        existing_data = load_data()
-        save_data(existing_data)
+        # save_data() builds new rows, so the cached ones need not be copied
+        save_data(load_data())
     except Exception:
         pass
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""Benchmark the candidate API against synthetic workbooks.
+
+Generates data.xlsx files of the requested sizes with realistic candidates
+(the sample headers, values drawn from /api/dropdown-options), then drives
+the list, add, update, delete, summary, group and login endpoints through
+the Flask test client from several threads. Reports latency percentiles,
+throughput and peak memory for each size.
+
+Each size runs in its own subprocess and temporary directory, so nothing
+touches the real data.xlsx or instance/ folder:
+
+    python benchmark.py --sizes 1000,10000,100000 --requests 200 --concurrency 8
+
+The storage engine and write mode follow the usual environment variables
+(STORAGE_ENGINE, ASYNC_WRITES, ...).
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya',
+               'Rohan', 'Divya', 'Karthik', 'Meera', 'John', 'Jane', 'Sam', 'Emily']
+LAST_NAMES = ['Sharma', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Patel', 'Menon', 'Rao',
+              'Singh', 'Das', 'Doe', 'Smith', 'Wilson', 'Davis']
+ORGANIZATIONS = ['Tech Solutions', 'Web Innovations', 'Creative Designs', 'DataWorks',
+                 'CloudNine Systems', 'Infosys', 'Wipro', 'Freshworks', 'Zoho', 'Startup Labs']
+CERTIFICATIONS = ['', '', 'AWS Certified Developer', 'Google UX Design', 'CKA',
+                  'Azure Fundamentals', 'PMP', 'Adobe Certified Expert']
+REMARKS = ['', '', 'Good communication', 'Strong fundamentals', 'Needs follow-up',
+           'Salary expectations high', 'Consider for junior positions', 'Excellent portfolio']
+CATEGORY_COLUMNS = ['Interested Position', 'Current Location', 'Interview Status',
+                    'Application Status', 'Notice Period']
+
+
+def _headers(app_module):
+    """The sample workbook's 32 headers plus the record id column"""
+    fields = [f for f in app_module.DESIRED_FIELDS if f != app_module.RECORD_ID_FIELD]
+    return ['Date'] + fields + ['Reference', app_module.RECORD_ID_FIELD]
+
+
+def generate_candidate(rng, options, index):
+    """Return one synthetic candidate record"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    current_ctc = rng.randrange(300000, 4000000, 10000)
+    offered = rng.random() < 0.2
+    date = datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(0, 60 * 24 * 700))
+    record = {
+        'Date': date.strftime('%Y-%m-%d %H:%M:%S'),
+        'Name': f'{first} {last}',
+        'Email ID': f'{first.lower()}.{last.lower()}{index}@example.com',
+        'Contact Number': str(rng.randrange(6000000000, 9999999999)),
+        'Current Organization': rng.choice(ORGANIZATIONS),
+        'Current CTC per Annum': str(current_ctc),
+        'Expected CTC per Annum': str(int(current_ctc * rng.uniform(1.0, 1.6))),
+        'Offered CTC': str(int(current_ctc * rng.uniform(1.1, 1.4))) if offered else '',
+        'Certifications': rng.choice(CERTIFICATIONS),
+        'Resume': f'https://example.com/resume/{index}',
+        'LinkedIn Profile': f'https://linkedin.com/in/candidate{index}',
+        'Comments': rng.choice(REMARKS),
+        'Referred By': rng.choice(['', 'Campus Recruitment', 'Job Portal', 'Employee Referral']),
+        'Initial Screening': rng.choice(REMARKS),
+        'Round 1 Remarks': rng.choice(REMARKS),
+        'Round 2 Remarks': rng.choice(REMARKS),
+        'Remarks': rng.choice(REMARKS),
+        'Final Remarks': rng.choice(REMARKS),
+        'Month Count': str(rng.randrange(1, 13)),
+        'Reference': rng.choice(['', 'Robert Johnson', 'Emily Davis']),
+    }
+    for column, values in options.items():
+        record[column] = rng.choice(values)
+    return record
+
+
+def generate_workbook(app_module, path, size, options, seed=0):
+    """Write a workbook of size synthetic candidates to path"""
+    rng = random.Random(seed)
+    headers = _headers(app_module)
+    rows = ([candidate.get(header, '') for header in headers]
+            for candidate in (dict(generate_candidate(rng, options, index),
+                                   **{app_module.RECORD_ID_FIELD: app_module._new_record_id()})
+                              for index in range(size)))
+    app_module._write_workbook(path, headers, rows)
+
+
+def _percentiles(latencies):
+    if not latencies:
+        return {}
+    points = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {'p50_ms': float(points[0]), 'p95_ms': float(points[1]), 'p99_ms': float(points[2]),
+            'max_ms': float(max(latencies) * 1000)}
+
+
+def _login(app_module):
+    client = app_module.app.test_client()
+    response = client.post('/login', data={'username': app_module.ADMIN_USERNAME,
+                                           'password': app_module.ADMIN_PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError('Benchmark login failed')
+    return client
+
+
+def run_phase(app_module, name, request_fn, requests, concurrency):
+    """Issue requests calls of request_fn(client, number) from concurrency threads"""
+    local = threading.local()
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def call(number):
+        if not hasattr(local, 'client'):
+            local.client = _login(app_module)
+        start = time.perf_counter()
+        response = request_fn(local.client, number)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(requests)))
+    wall = time.perf_counter() - start
+    result = {'phase': name, 'requests': requests, 'errors': len(errors),
+              'throughput_rps': requests / wall if wall else 0.0}
+    result.update(_percentiles(latencies))
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_size(size, requests, concurrency, seed):
+    """Benchmark one dataset size in the current (temporary) directory"""
+    sys.path.insert(0, APP_DIR)
+    import app as app_module
+
+    app_module.init_user_db()
+    rng = random.Random(seed)
+    client = _login(app_module)
+    options = {column: values for column, values in client.get('/api/dropdown-options').json.items()}
+
+    results = []
+    start = time.perf_counter()
+    generate_workbook(app_module, app_module.EXCEL_FILE, size, options, seed)
+    results.append({'phase': 'generate', 'requests': 1, 'errors': 0,
+                    'total_ms': (time.perf_counter() - start) * 1000, 'peak_rss_mb': _peak_rss_mb()})
+
+    start = time.perf_counter()
+    response = client.get('/api/data?limit=1')
+    results.append({'phase': 'cold_load', 'requests': 1, 'errors': int(response.status_code >= 400),
+                    'total_ms': (time.perf_counter() - start) * 1000, 'peak_rss_mb': _peak_rss_mb()})
+
+    ids = list(client.get('/api/data?fields=Name').json['ids'])
+    ids_lock = threading.Lock()
+    pages = max(1, size // 50)
+
+    def take_id():
+        with ids_lock:
+            return ids.pop(rng.randrange(len(ids)))
+
+    def sample_id():
+        with ids_lock:
+            return ids[rng.randrange(len(ids))]
+
+    phases = [
+        ('list_page', requests, lambda c, n: c.get(
+            f'/api/data?page={rng.randrange(1, pages + 1)}&limit=50&sort=Name')),
+        ('list_all', max(1, requests // 20), lambda c, n: c.get('/api/data')),
+        ('add', requests, lambda c, n: c.post(
+            '/api/data', json=generate_candidate(rng, options, size + n))),
+        ('update', requests, lambda c, n: c.patch(
+            f'/api/data/{sample_id()}', json={'Application Status': rng.choice(options['Application Status']),
+                                             'Comments': f'Updated {n}'})),
+        ('delete', min(requests, len(ids) // 2), lambda c, n: c.delete(f'/api/data/{take_id()}')),
+        ('summary', requests, lambda c, n: c.get('/api/analysis/summary?percentiles=1&hike=1')),
+        ('group', requests, lambda c, n: c.get(
+            f'/api/analysis/group/{rng.choice(CATEGORY_COLUMNS)}?percentiles=1')),
+        ('login', requests, lambda c, n: c.post('/login', data={
+            'username': app_module.ADMIN_USERNAME, 'password': app_module.ADMIN_PASSWORD})),
+    ]
+    for name, count, request_fn in phases:
+        results.append(run_phase(app_module, name, request_fn, count, concurrency))
+
+    app_module.flush_writes()
+    start = time.perf_counter()
+    app_module.flush_journal()
+    results.append({'phase': 'flush', 'requests': 1, 'errors': 0,
+                    'total_ms': (time.perf_counter() - start) * 1000, 'peak_rss_mb': _peak_rss_mb()})
+    return results
+
+
+def _print_results(size, results):
+    print(f"\n{size} candidates")
+    print(f"{'phase':<12}{'requests':>9}{'errors':>7}{'req/s':>10}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'p99 ms':>10}{'total ms':>10}{'peak MB':>9}")
+    for result in results:
+        def column(key, width):
+            value = result.get(key)
+            return f"{value:>{width}.1f}" if value is not None else ' ' * width
+        print(f"{result['phase']:<12}{result['requests']:>9}{result['errors']:>7}"
+              f"{column('throughput_rps', 10)}{column('p50_ms', 10)}{column('p95_ms', 10)}"
+              f"{column('p99_ms', 10)}{column('total_ms', 10)}{column('peak_rss_mb', 9)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000', help='comma separated dataset sizes')
+    parser.add_argument('--requests', type=int, default=200, help='requests per phase')
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--run-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size is not None:
+        # Child process: benchmark one size and print the results as JSON
+        results = run_size(args.run_size, args.requests, args.concurrency, args.seed)
+        print(json.dumps(results))
+        return
+
+    all_results = {}
+    for size in [int(size) for size in args.sizes.split(',') if size]:
+        with tempfile.TemporaryDirectory(prefix='candidate-bench-') as work_dir:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run-size', str(size),
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+                 '--seed', str(args.seed)],
+                cwd=work_dir, check=True, stdout=subprocess.PIPE, text=True).stdout
+        # The app prints progress messages; the results are the last line
+        results = json.loads(output.strip().splitlines()[-1])
+        all_results[size] = results
+        _print_results(size, results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
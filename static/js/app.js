@@ -4,6 +4,35 @@ let tableColumns = [];
 let groupChart = null;
 let distributionChart = null;
 let dropdownOptions = {};
+// Revision of each row in tableData when it was loaded, sent as If-Match on writes
+let tableRevisions = [];
+let tableIsAdmin = false;
+// Change version the table reflects, from /api/data and the change feed
+let changesVersion = null;
+let changeStream = null;
+// Server-side paging and sorting of the table
+const TABLE_PAGE_SIZE = 50;
+let tablePage = 1;
+let tableTotal = 0;
+let tableSort = null;
+let tableOrder = 'asc';
+
+// Field holding each record's stable id, assigned by the server
+const RECORD_ID_FIELD = 'ID';
+
+// URL and headers for a write to the record at a table index; the server
+// rejects the write with 409 if the record changed since it was loaded
+function recordUrl(index) {
+    return `/api/data/${encodeURIComponent(tableData[index][RECORD_ID_FIELD])}`;
+}
+
+function recordHeaders(index) {
+    const headers = { 'Content-Type': 'application/json' };
+    if (tableRevisions[index]) {
+        headers['If-Match'] = `"${tableRevisions[index]}"`;
+    }
+    return headers;
+}
 
 // Desired field order for candidate management UI
 const FIELD_ORDER = [
@@ -103,6 +132,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     fetchGroupAnalysis(groupByColumn.value);
                 }
                 updateDistributionChart();
+                fetchDashboard().catch(error => console.error('Error fetching dashboard:', error));
             }
         });
     });
@@ -126,30 +156,28 @@ function updateDistributionChart() {
         return;
     }
     
-    const values = tableData
-        .map(item => parseFloat(item[selectedColumn]))
-        .filter(value => !isNaN(value));
-    
-    if (values.length === 0) {
+    // Bins are computed on the server
+    fetch(`/api/analysis/summary?histogram=${encodeURIComponent(selectedColumn)}&bins=10`)
+        .then(response => response.json())
+        .then(summary => renderDistributionChart(selectedColumn, summary.histogram))
+        .catch(error => {
+            console.error('Error fetching distribution:', error);
+            showNotification('Failed to load distribution data', 'error');
+        });
+}
+
+// Render histogram bins returned by /api/analysis/summary
+function renderDistributionChart(selectedColumn, histogram) {
+    if (!histogram) {
         document.getElementById('distributionChartContainer').innerHTML = 
             '<div class="alert alert-info">No valid numeric data available for distribution analysis</div>';
         return;
     }
     
-    const min = Math.min(...values);
-    const max = Math.max(...values);
-    const binCount = Math.min(10, values.length);
-    const binSize = (max - min) / binCount;
-    
-    const bins = Array(binCount).fill(0);
-    values.forEach(value => {
-        const binIndex = Math.min(Math.floor((value - min) / binSize), binCount - 1);
-        bins[binIndex]++;
-    });
-    
-    const binLabels = Array(binCount).fill(0).map((_, i) => {
-        const start = min + i * binSize;
-        const end = min + (i + 1) * binSize;
+    const bins = histogram.counts;
+    const binLabels = bins.map((_, i) => {
+        const start = histogram.edges[i];
+        const end = histogram.edges[i + 1];
         return `${start.toFixed(1)}-${end.toFixed(1)}`;
     });
     
@@ -368,25 +396,139 @@ async function fetchDropdownOptions() {
     }
 }
 
-// Fetch data from the API
+// URL of the current page of the table
+function dataUrl() {
+    const params = new URLSearchParams({ page: tablePage, limit: TABLE_PAGE_SIZE });
+    if (tableSort) {
+        params.set('sort', tableSort);
+        params.set('order', tableOrder);
+    }
+    return `/api/data?${params}`;
+}
+
+// Show a page of the response, or go back to the last page if this one is now past the end
+function showDataPage(responseData) {
+    const { data, is_admin } = responseData;
+    const lastPage = Math.max(1, Math.ceil(responseData.total / TABLE_PAGE_SIZE));
+    if (tablePage > lastPage) {
+        tablePage = lastPage;
+        fetchData();
+        return;
+    }
+    tableTotal = responseData.total;
+    tableRevisions = responseData.revisions || [];
+    changesVersion = responseData.version;
+    populateTable(data, is_admin);
+    renderPagination();
+    subscribeToChanges();
+}
+
+// Fetch the current page of the table from the API
 function fetchData() {
-    fetch('/api/data')
+    fetch(dataUrl())
         .then(response => response.json())
-        .then(responseData => {
-            const { data, is_admin } = responseData;
-            console.log('API Data:', data);
-            console.log('Is Admin:', is_admin);
-            populateTable(data, is_admin);
-        })
+        .then(showDataPage)
         .catch(error => {
             console.error('Error fetching data:', error);
             showNotification('Failed to load data. Please try again later.', 'error');
         });
 }
 
+function goToPage(page) {
+    tablePage = page;
+    fetchData();
+}
+
+// Sort the table by a column, or reverse the order if it is already sorted by it
+function sortTable(column) {
+    tableOrder = tableSort === column && tableOrder === 'asc' ? 'desc' : 'asc';
+    tableSort = column;
+    goToPage(1);
+}
+
+function renderPagination() {
+    const container = document.getElementById('dataTablePagination');
+    if (!container) {
+        return;
+    }
+    const lastPage = Math.max(1, Math.ceil(tableTotal / TABLE_PAGE_SIZE));
+    const first = tableTotal ? (tablePage - 1) * TABLE_PAGE_SIZE + 1 : 0;
+    const last = Math.min(tablePage * TABLE_PAGE_SIZE, tableTotal);
+    container.innerHTML = `
+        <small class="text-muted">${first}–${last} of ${tableTotal}</small>
+        <div class="btn-group btn-group-sm">
+            <button class="btn btn-outline-secondary" ${tablePage <= 1 ? 'disabled' : ''} onclick="goToPage(${tablePage - 1})">
+                <i class="bi bi-chevron-left"></i> Previous
+            </button>
+            <button class="btn btn-outline-secondary" disabled>Page ${tablePage} of ${lastPage}</button>
+            <button class="btn btn-outline-secondary" ${tablePage >= lastPage ? 'disabled' : ''} onclick="goToPage(${tablePage + 1})">
+                Next <i class="bi bi-chevron-right"></i>
+            </button>
+        </div>
+    `;
+}
+
+// Fetch only the records changed since the table was loaded and apply them
+function fetchChanges() {
+    if (changesVersion === null) {
+        fetchData();
+        return;
+    }
+    fetch(`/api/data/changes?since=${encodeURIComponent(changesVersion)}`)
+        .then(response => response.json())
+        .then(applyChanges)
+        .catch(error => {
+            console.error('Error fetching changes:', error);
+            fetchData();
+        });
+}
+
+// Receive changes made in other browsers as Server-Sent Events
+function subscribeToChanges() {
+    if (changeStream || !window.EventSource || changesVersion === null) {
+        return;
+    }
+    changeStream = new EventSource(`/api/data/stream?since=${encodeURIComponent(changesVersion)}`);
+    changeStream.addEventListener('changes', event => applyChanges(JSON.parse(event.data)));
+}
+
+// Merge a change feed delta (inserted, updated, deleted) into the table
+function applyChanges(changes) {
+    if (changes.reset) {
+        // The server no longer knows our version; load the table again
+        fetchData();
+        return;
+    }
+    changesVersion = changes.version;
+    if (!changes.inserted.length && !changes.updated.length && !changes.deleted.length) {
+        return;
+    }
+
+    if (changes.inserted.length || changes.deleted.length || tableSort) {
+        // Rows may have moved between pages; load the current page again
+        fetchData();
+    } else {
+        // Only edits: replace the rows shown on this page in place
+        const updated = new Map(changes.updated.map(row => [row[RECORD_ID_FIELD], row]));
+        const rows = tableData.map((row, index) => {
+            const id = row[RECORD_ID_FIELD];
+            if (!updated.has(id)) {
+                return row;
+            }
+            tableRevisions[index] = changes.revisions[id];
+            return updated.get(id);
+        });
+        populateTable(rows, tableIsAdmin);
+    }
+    if (document.getElementById('analysisTab').classList.contains('active')) {
+        fetchDashboard().catch(error => console.error('Error fetching dashboard:', error));
+    }
+}
+
 // Function to populate the data table
 function populateTable(data, isAdmin) {
     tableData = data;
+    tableIsAdmin = isAdmin;
     const tableBody = document.getElementById('dataTableBody');
     const tableHead = document.getElementById('dataTableHead');
     
@@ -403,7 +545,7 @@ function populateTable(data, isAdmin) {
     if (data && data.length > 0) {
         const availableColumns = Object.keys(data[0]);
         const ordered = columnsToShow.filter(c => availableColumns.includes(c));
-        const remaining = availableColumns.filter(c => !ordered.includes(c) && c !== 'Date');
+        const remaining = availableColumns.filter(c => !ordered.includes(c) && c !== 'Date' && c !== RECORD_ID_FIELD);
         const dateFirst = availableColumns.includes('Date') ? ['Date'] : [];
 
         tableColumns = isAdmin ? [...dateFirst, ...ordered, ...remaining] : columnsToShow;
@@ -413,6 +555,12 @@ function populateTable(data, isAdmin) {
         tableColumns.forEach(column => {
             const th = document.createElement('th');
             th.textContent = column === 'Date' ? 'Date' : column;
+            // Click to sort on the server
+            th.style.cursor = 'pointer';
+            if (column === tableSort) {
+                th.textContent += tableOrder === 'asc' ? ' ▲' : ' ▼';
+            }
+            th.addEventListener('click', () => sortTable(column));
             headerRow.appendChild(th);
         });
         
@@ -533,8 +681,8 @@ function populateTable(data, isAdmin) {
             if (isAdmin) {
                 const actionTd = document.createElement('td');
                 actionTd.innerHTML = `
-                    <button class="btn btn-sm btn-primary edit-btn" data-id="${row.id}" title="Edit"><i class="bi bi-pencil"></i></button>
-                    <button class="btn btn-sm btn-danger delete-btn" data-id="${row.id}" title="Delete"><i class="bi bi-trash"></i></button>
+                    <button class="btn btn-sm btn-primary edit-btn" data-id="${row[RECORD_ID_FIELD]}" title="Edit"><i class="bi bi-pencil"></i></button>
+                    <button class="btn btn-sm btn-danger delete-btn" data-id="${row[RECORD_ID_FIELD]}" title="Delete"><i class="bi bi-trash"></i></button>
                 `;
                 tr.appendChild(actionTd);
             }
@@ -552,18 +700,13 @@ function populateTable(data, isAdmin) {
 
 // Function to update record status from the table
 function updateRecordStatus(index, column, newStatus) {
-    const record = tableData[index];
-    const updatedRecord = { ...record, [column]: newStatus };
-
-    fetch(`/api/data/${index}`, {
-        method: 'PUT',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(updatedRecord),
+    fetch(recordUrl(index), {
+        method: 'PATCH',
+        headers: recordHeaders(index),
+        body: JSON.stringify({ [column]: newStatus }),
     })
     .then(response => {
-        if (!response.ok) {
+        if (!response.ok && response.status !== 409) {
             throw new Error('Network response was not ok');
         }
         return response.json();
@@ -572,6 +715,7 @@ function updateRecordStatus(index, column, newStatus) {
         if (data.status === 'success') {
             showNotification('Status updated successfully!', 'success');
             tableData[index][column] = newStatus; // Update local data to avoid full refresh
+            tableRevisions[index] = data.revision;
         } else {
             showNotification(data.message || 'Failed to update status.', 'error');
             fetchData(); // Revert change on failure
@@ -606,7 +750,8 @@ function updateGroupByOptions() {
             column !== 'Final Remarks' &&
             column !== 'Initial Screening' && 
             column !== 'Round 1 Remarks' && 
-            column !== 'Round 2 Remarks') {
+            column !== 'Round 2 Remarks' &&
+            column !== RECORD_ID_FIELD) {
             
             const option = document.createElement('option');
             option.value = column;
@@ -840,7 +985,7 @@ function saveNewRecord() {
     .then(data => {
         if (data.status === 'success') {
             showNotification('Record added successfully!', 'success');
-            fetchData(); // Refresh table
+            fetchChanges(); // Pick up the new row
             bootstrap.Modal.getInstance(document.getElementById('addDataModal')).hide();
         } else {
             showNotification(data.message || 'Failed to add record.', 'error');
@@ -865,18 +1010,16 @@ function updateRecord() {
         updatedRecord[originalKey] = value;
     }
     
-    fetch(`/api/data/${index}`, {
+    fetch(recordUrl(index), {
         method: 'PUT',
-        headers: {
-            'Content-Type': 'application/json',
-        },
+        headers: recordHeaders(index),
         body: JSON.stringify(updatedRecord),
     })
     .then(response => response.json())
     .then(data => {
         if (data.status === 'success') {
             showNotification('Record updated successfully!', 'success');
-            fetchData(); // Refresh table
+            fetchChanges(); // Pick up the updated row
             bootstrap.Modal.getInstance(document.getElementById('editDataModal')).hide();
         } else {
             showNotification(data.message || 'Failed to update record.', 'error');
@@ -891,14 +1034,15 @@ function updateRecord() {
 // Function to delete record
 function deleteRecord(index) {
     if (confirm('Are you sure you want to delete this record?')) {
-        fetch(`/api/data/${index}`, {
+        fetch(recordUrl(index), {
             method: 'DELETE',
+            headers: recordHeaders(index),
         })
         .then(response => response.json())
         .then(data => {
             if (data.status === 'success') {
                 showNotification('Record deleted successfully!', 'success');
-                fetchData(); // Refresh table
+                fetchChanges(); // Drop the deleted row
             } else {
                 showNotification(data.message || 'Failed to delete record.', 'error');
             }
@@ -1057,87 +1201,49 @@ function updateGroupChart(data, groupColumn) {
 }
 
 // Analytics Functions
-function updateMonthlyStats(data) {
-    const monthlyStats = {};
-    const monthNames = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
-    
-    // Initialize monthly stats
-    data.forEach(candidate => {
-        const date = new Date(candidate.Timestamp);
-        const monthKey = `${monthNames[date.getMonth()]} ${date.getFullYear()}`;
-        
-        if (!monthlyStats[monthKey]) {
-            monthlyStats[monthKey] = {
-                applicants: 0,
-                accepted: 0,
-                rejected: 0,
-                inNotice: 0,
-                joined: 0,
-                feedbackGiven: 0
-            };
-        }
-        
-        monthlyStats[monthKey].applicants++;
-        
-        switch (candidate['Application Status']) {
-            case 'Accepted':
-                monthlyStats[monthKey].accepted++;
-                break;
-            case 'Rejected':
-                monthlyStats[monthKey].rejected++;
-                break;
-            case 'In Notice':
-                monthlyStats[monthKey].inNotice++;
-                break;
-            case 'Joined':
-                monthlyStats[monthKey].joined++;
-                break;
-        }
-        
-        if (candidate['Reference Feedback']) {
-            monthlyStats[monthKey].feedbackGiven++;
-        }
-    });
-    
-    // Sort months chronologically
-    const sortedMonths = Object.keys(monthlyStats).sort((a, b) => {
-        const [monthA, yearA] = a.split(' ');
-        const [monthB, yearB] = b.split(' ');
-        return new Date(`${monthA} 1, ${yearA}`) - new Date(`${monthB} 1, ${yearB}`);
-    });
-    
+let applicationStatusChart = null;
+let referenceFeedbackChart = null;
+let overallDistributionChart = null;
+
+// Fetch the precomputed analysis-tab series and render them
+function fetchDashboard() {
+    return fetch('/api/analysis/dashboard')
+        .then(response => response.json())
+        .then(dashboard => {
+            updateMonthlyStats(dashboard);
+            updateApplicationStatusChart(dashboard);
+            updateReferenceFeedbackChart(dashboard);
+            updateOverallDistributionChart(dashboard);
+        });
+}
+
+function updateMonthlyStats(dashboard) {
     // Update table
     const tbody = document.getElementById('monthlyStatsBody');
     const tfoot = document.getElementById('monthlyStatsTotals');
     tbody.innerHTML = '';
     
     const totals = {
-        applicants: 0,
-        accepted: 0,
-        rejected: 0,
-        inNotice: 0,
-        joined: 0,
-        feedbackGiven: 0
+        applicants: dashboard.totals.applicants,
+        accepted: dashboard.totals.accepted,
+        rejected: dashboard.totals.rejected,
+        inNotice: dashboard.totals.in_notice,
+        joined: dashboard.totals.joined,
+        feedbackGiven: dashboard.totals.feedback_given
     };
     
-    sortedMonths.forEach(month => {
-        const stats = monthlyStats[month];
+    dashboard.monthly.forEach(stats => {
         const row = document.createElement('tr');
         row.innerHTML = `
-            <td>${month}</td>
+            <td>${stats.label}</td>
             <td>${stats.applicants}</td>
             <td>${stats.accepted}</td>
             <td>${stats.rejected}</td>
-            <td>${stats.inNotice}</td>
+            <td>${stats.in_notice}</td>
             <td>${stats.joined}</td>
-            <td>${stats.feedbackGiven}</td>
+            <td>${stats.feedback_given}</td>
         `;
         tbody.appendChild(row);
-        
-        // Update totals
-        Object.keys(totals).forEach(key => {
-            totals[key] += stats[key];
-        });
     });
     
     // Add totals row
@@ -1180,23 +1286,20 @@ function updateKeyMetrics(totals) {
     `).join('');
 }
 
-function updateApplicationStatusChart(data) {
+function updateApplicationStatusChart(dashboard) {
     const statusCounts = {
-        'Total Applicants': data.length,
-        'Accepted': 0,
-        'Rejected': 0,
-        'In Notice': 0,
-        'Joined': 0
+        'Total Applicants': dashboard.totals.applicants,
+        'Accepted': dashboard.totals.accepted,
+        'Rejected': dashboard.totals.rejected,
+        'In Notice': dashboard.totals.in_notice,
+        'Joined': dashboard.totals.joined
     };
     
-    data.forEach(candidate => {
-        if (statusCounts.hasOwnProperty(candidate['Application Status'])) {
-            statusCounts[candidate['Application Status']]++;
-        }
-    });
-    
     const ctx = document.getElementById('applicationStatusChart').getContext('2d');
-    new Chart(ctx, {
+    if (applicationStatusChart) {
+        applicationStatusChart.destroy();
+    }
+    applicationStatusChart = new Chart(ctx, {
         type: 'bar',
         data: {
             labels: Object.keys(statusCounts),
@@ -1231,34 +1334,14 @@ function updateApplicationStatusChart(data) {
     });
 }
 
-function updateReferenceFeedbackChart(data) {
-    const feedbackCounts = {
-        'All 3 Given': 0,
-        '2 Given': 0,
-        '1 Given': 0,
-        '0 Given': 0
-    };
-    
-    data.forEach(candidate => {
-        const feedback = candidate['Reference Feedback'] || '';
-        const count = feedback.split(',').filter(f => f.trim()).length;
-        switch (count) {
-            case 3:
-                feedbackCounts['All 3 Given']++;
-                break;
-            case 2:
-                feedbackCounts['2 Given']++;
-                break;
-            case 1:
-                feedbackCounts['1 Given']++;
-                break;
-            default:
-                feedbackCounts['0 Given']++;
-        }
-    });
+function updateReferenceFeedbackChart(dashboard) {
+    const feedbackCounts = dashboard.feedback_counts;
     
     const ctx = document.getElementById('referenceFeedbackChart').getContext('2d');
-    new Chart(ctx, {
+    if (referenceFeedbackChart) {
+        referenceFeedbackChart.destroy();
+    }
+    referenceFeedbackChart = new Chart(ctx, {
         type: 'bar',
         data: {
             labels: Object.keys(feedbackCounts),
@@ -1292,19 +1375,14 @@ function updateReferenceFeedbackChart(data) {
     });
 }
 
-function updateOverallDistributionChart(data) {
-    const months = {};
-    data.forEach(candidate => {
-        const date = new Date(candidate.Timestamp);
-        const monthKey = date.toLocaleDateString('en-US', { month: 'short', year: 'numeric' });
-        if (!months[monthKey]) {
-            months[monthKey] = 0;
-        }
-        months[monthKey]++;
-    });
+function updateOverallDistributionChart(dashboard) {
+    const months = dashboard.distribution;
     
     const ctx = document.getElementById('overallDistributionChart').getContext('2d');
-    new Chart(ctx, {
+    if (overallDistributionChart) {
+        overallDistributionChart.destroy();
+    }
+    overallDistributionChart = new Chart(ctx, {
         type: 'doughnut',
         data: {
             labels: Object.keys(months),
@@ -1345,19 +1423,16 @@ document.addEventListener('DOMContentLoaded', () => {
 // Update the existing refreshData function to include analytics updates
 async function refreshData() {
     try {
-        const response = await fetch('/api/data');
+        const response = await fetch(dataUrl());
         const data = await response.json();
         console.log('Data refreshed:', data); // Add this line to log the refreshed data
         
         // Update table
-        populateTable(data.data, data.is_admin);
+        showDataPage(data);
         
         // Update analytics if on analytics tab
         if (document.getElementById('analysisTab').classList.contains('active')) {
-            updateMonthlyStats(data);
-            updateApplicationStatusChart(data);
-            updateReferenceFeedbackChart(data);
-            updateOverallDistributionChart(data);
+            await fetchDashboard();
         }
     } catch (error) {
         console.error('Error refreshing data:', error);
@@ -1413,7 +1488,7 @@ function showCandidateDetails(candidate, index, isAdmin) {
     // Add remaining fields only if admin
     if (isAdmin) {
         Object.entries(candidate).forEach(([field, value]) => {
-            if (!FIELD_ORDER.includes(field) && field !== 'Remarks') { // Exclude Remarks as it's handled separately
+            if (!FIELD_ORDER.includes(field) && field !== 'Remarks' && field !== RECORD_ID_FIELD) { // Exclude Remarks as it's handled separately
                 let displayValue = formatFieldValue(field, value);
                 let inputType = 'text';
 
@@ -1459,31 +1534,10 @@ function showCandidateDetails(candidate, index, isAdmin) {
                 editInput.style.display = 'none';
                 displaySpan.textContent = editInput.value;
     
-                // Implement save logic here
-                const updatedCandidate = {};
-                updatedCandidate[fieldName] = editInput.value;
-                const candidateId = item.dataset.candidateId; // Retrieve candidate ID
-    
-                fetch(`/api/data/${candidateId}`, {
-                    method: 'PUT',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(updatedCandidate),
-                })
-                .then(response => response.json())
-                .then(data => {
-                    if (data.status === 'success') {
-                        showToast('Candidate updated successfully!', 'success');
-                        // Optionally, refresh the table data or just update the specific cell
-                    } else {
-                        showToast(`Error updating candidate: ${data.message}`, 'danger');
-                    }
-                })
-                .catch(error => {
-                    console.error('Error saving candidate:', error);
-                    showToast('Error saving candidate.', 'danger');
-                });
+                // Edits are coalesced and sent together as one PATCH
+                if (editInput.value !== editInput.defaultValue) {
+                    queueFieldChange(index, fieldName, editInput.value);
+                }
             });
         }
     });
@@ -1543,13 +1597,18 @@ function showCandidateDetails(candidate, index, isAdmin) {
             editRemarksBtn.style.display = 'block';
             saveRemarksBtn.style.display = 'none';
             candidateRemarks.setAttribute('readonly', true);
-            // Implement logic to save all updated fields to the backend
-            const updatedCandidate = {};
-            document.querySelectorAll('.edit-mode').forEach(input => {
-                const fieldName = input.id.replace('input-', '').replace(/([A-Z])/g, ' $1').trim(); // Convert 'FieldName' to 'Field Name'
-                updatedCandidate[fieldName] = input.value;
+            // Save only the fields that changed, together with any queued edits
+            const updatedCandidate = takePendingFieldChanges();
+            document.querySelectorAll('.candidate-detail-item').forEach(item => {
+                const label = item.querySelector('.candidate-detail-label');
+                const input = item.querySelector('input.edit-mode');
+                if (label && input && input.value !== input.defaultValue) {
+                    updatedCandidate[label.textContent.replace(':', '').trim()] = input.value;
+                }
             });
-            updatedCandidate.Remarks = candidateRemarks.value;
+            if (candidateRemarks.value !== candidateRemarks.defaultValue) {
+                updatedCandidate.Remarks = candidateRemarks.value;
+            }
 
             // Assuming the candidate object passed to showCandidateDetails has an 'originalIndex' or similar identifier
             // For now, we'll use the index from the global candidates array if available, or pass it from the table click event.
@@ -1557,19 +1616,21 @@ function showCandidateDetails(candidate, index, isAdmin) {
             // For this implementation, I'll assume the `candidate` object passed to `showCandidateDetails` has an `index` property.
             const candidateIndex = index; // This needs to be passed correctly from the table row click
 
-            if (candidateIndex !== undefined) {
-                fetch(`/api/data/${candidateIndex}`, {
-                    method: 'PUT',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
+            if (candidateIndex !== undefined && Object.keys(updatedCandidate).length === 0) {
+                bootstrap.Modal.getInstance(modal).hide(); // Nothing changed
+            } else if (candidateIndex !== undefined) {
+                fetch(recordUrl(candidateIndex), {
+                    method: 'PATCH',
+                    headers: recordHeaders(candidateIndex),
                     body: JSON.stringify(updatedCandidate),
                 })
                 .then(response => response.json())
                 .then(data => {
                     if (data.status === 'success') {
                         showToast('Candidate updated successfully!', 'success');
-                        
+                        Object.assign(tableData[candidateIndex], updatedCandidate);
+                        tableRevisions[candidateIndex] = data.revision;
+
                         bootstrap.Modal.getInstance(modal).hide(); // Close the modal
                     } else {
                         showToast(`Error updating candidate: ${data.message}`, 'danger');
@@ -1594,10 +1655,64 @@ function showCandidateDetails(candidate, index, isAdmin) {
     editRemarksBtn.onclick = () => toggleEditMode(true, isAdmin);
     saveRemarksBtn.onclick = () => toggleEditMode(false, isAdmin);
 
+    // Send any edits still waiting when the modal closes
+    modal.addEventListener('hidden.bs.modal', flushFieldChanges, { once: true });
+
     const bsModal = new bootstrap.Modal(modal);
     bsModal.show();
 }
 
+// Field edits from the candidate detail modal, sent together as one PATCH
+const FIELD_CHANGE_DELAY = 1500;
+let pendingFieldChanges = { index: null, changes: {} };
+let pendingFieldTimer = null;
+
+function queueFieldChange(index, field, value) {
+    if (pendingFieldChanges.index !== null && pendingFieldChanges.index !== index) {
+        flushFieldChanges();
+    }
+    pendingFieldChanges.index = index;
+    pendingFieldChanges.changes[field] = value;
+    clearTimeout(pendingFieldTimer);
+    pendingFieldTimer = setTimeout(flushFieldChanges, FIELD_CHANGE_DELAY);
+}
+
+// Remove and return the queued changes so they can be sent with a larger save
+function takePendingFieldChanges() {
+    const changes = pendingFieldChanges.changes;
+    clearTimeout(pendingFieldTimer);
+    pendingFieldChanges = { index: null, changes: {} };
+    return changes;
+}
+
+function flushFieldChanges() {
+    const index = pendingFieldChanges.index;
+    const changes = takePendingFieldChanges();
+    if (index === null || Object.keys(changes).length === 0) {
+        return;
+    }
+
+    fetch(recordUrl(index), {
+        method: 'PATCH',
+        headers: recordHeaders(index),
+        body: JSON.stringify(changes),
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            showToast('Candidate updated successfully!', 'success');
+            Object.assign(tableData[index], changes);
+            tableRevisions[index] = data.revision;
+        } else {
+            showToast(`Error updating candidate: ${data.message}`, 'danger');
+        }
+    })
+    .catch(error => {
+        console.error('Error saving candidate:', error);
+        showToast('Error saving candidate.', 'danger');
+    });
+}
+
 // Helper function to show toast notifications
 function showToast(message, type) {
     const toastContainer = document.createElement('div');
@@ -1,4 +1,8 @@
-from app import app
+from app import app, init_user_db
+
+# Entry point for WSGI servers. Several worker processes can share the
+# candidate storage, e.g. gunicorn -w 4 wsgi:app
+init_user_db()
 
 if __name__ == '__main__':
-    app.run()
\ No newline at end of file
+    app.run()